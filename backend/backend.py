@@ -1,19 +1,51 @@
 from flask import Flask
-from flask import jsonify, request
+from flask import Blueprint, Response, current_app, g, jsonify, request, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
 import os.path
-from verify_proof import verify_proof
+from verify_proof import get_cache, pool_stats, verify_proof
 from flask_cors import CORS, cross_origin
 basedir = os.path.abspath(os.path.dirname(__file__))
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from signature_check import check_signature
+from key_registry import get_registry, normalize_point
+from sqlalchemy.exc import IntegrityError
+import hashlib
+import threading
+from functools import partial
+from nullifier_filter import NullifierFilter
+from submissions import SUBMISSION_LEASE, SUBMISSION_QUEUE_SIZE, SUBMISSION_RETAIN, SubmissionQueue
+from config import DATABASE_URL, MAX_CONTENT_LENGTH, engine_options
+from response_cache import ResponseCache, response_etag
+from urllib.parse import urlencode
+from search import init_search, match_query, rebuild_search
+from public_inputs import check_public_inputs
+from root_cache import get_root_cache
+from metrics import REGISTRY, SERVER_TIMING, Counter, CounterFunc, Gauge, Histogram, request_timings, server_timing, timed
+import time
+import json
+import uuid
 
-app = Flask(__name__)
-# Allow CORS from any origin on all routes
-CORS(app, origins=["http://localhost:5173"])
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(basedir, 'data.sqlite')
+db = SQLAlchemy()
+bp = Blueprint("reviews", __name__, cli_group=None)
 
-db = SQLAlchemy(app)
+BATCH_MAX_SIZE = int(os.environ.get("BATCH_MAX_SIZE", "500"))
+BATCH_VERIFY_THREADS = int(os.environ.get("BATCH_VERIFY_THREADS", "8"))
+
+STAGE_SECONDS = Histogram("review_stage_seconds", "Time spent in each submission stage.", ["stage"])
+SUBMISSIONS = Counter("review_submissions_total", "Finished submissions by result.", ["result"])
+FAILURES = Counter("review_failures_total", "Rejected submissions by reason.", ["reason"])
+FAILURE_REASONS = {
+    "Review already submitted - nullifier triggered": "nullifier_hit",
+    "Unknown public key": "unknown_key",
+    "Proof Verification Failed": "proof_failed",
+    "Invalid Signature": "bad_signature",
+    "Submission queue full, retry later": "queue_full",
+    "Public input mismatch": "public_input_mismatch",
+    "Unknown school root": "unknown_root",
+    "Malformed proof": "parse_error",
+    "Invalid hex data": "parse_error",
+}
 
 class Review(db.Model):
     __tablename__ = 'review'
@@ -32,6 +64,11 @@ class Review(db.Model):
     public_keyX = db.Column(db.Text)
     public_keyY = db.Column(db.Text)
 
+    __table_args__ = (
+        db.Index("ix_review_college_department_class", "college", "department", "class_name"),
+        db.Index("ix_review_professor_name", "professor_name"),
+    )
+
     def __str__(self):
         return str(review_serialize(self))
 
@@ -43,10 +80,57 @@ class Nulifier(db.Model):
     class_name = db.Column(db.Text)
     pk_x = db.Column(db.Text)
     pk_y = db.Column(db.Text)
+    # sha256 over college/department/class/pk; see nullifier_digest()
+    digest = db.Column(db.String(64), unique=True, nullable=False)
 
     def __str__(self):
         return str(nullifier_serialize(self))
 
+class Submission(db.Model):
+    """Ticket of an asynchronous submission, shared by all worker processes."""
+    __tablename__ = 'submission'
+    ticket = db.Column(db.String(32), primary_key=True)
+    status = db.Column(db.Text, nullable=False)  # pending, accepted or rejected
+    reason = db.Column(db.Text)
+    # Review arguments as JSON while pending, so another process can retry them.
+    payload = db.Column(db.Text)
+    # When a process last took the job; others retry it once the lease expires.
+    claimed_at = db.Column(db.Float, nullable=False)
+    finished_at = db.Column(db.Float)
+
+    __table_args__ = (
+        db.Index("ix_submission_status_claimed_at", "status", "claimed_at"),
+    )
+
+class WriteVersion(db.Model):
+    """Single-row counter bumped in the same transaction as every review insert."""
+    __tablename__ = 'write_version'
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+
+STATS_KEY = ["college", "department", "class_name", "professor_name"]
+
+class ReviewStats(db.Model):
+    """Running totals per (college, department, class_name, professor_name)."""
+    __tablename__ = 'review_stats'
+    college = db.Column(db.Text, primary_key=True)
+    department = db.Column(db.Text, primary_key=True)
+    class_name = db.Column(db.Text, primary_key=True)
+    professor_name = db.Column(db.Text, primary_key=True)
+    review_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Float, nullable=False, default=0.0)
+    recommend_count = db.Column(db.Integer, nullable=False, default=0)
+
+class GradeStats(db.Model):
+    """Grade histogram buckets for the same key as ReviewStats."""
+    __tablename__ = 'review_grade_stats'
+    college = db.Column(db.Text, primary_key=True)
+    department = db.Column(db.Text, primary_key=True)
+    class_name = db.Column(db.Text, primary_key=True)
+    professor_name = db.Column(db.Text, primary_key=True)
+    grade = db.Column(db.Text, primary_key=True)
+    review_count = db.Column(db.Integer, nullable=False, default=0)
+
 def review_serialize(review):
     return {
         'text': review.text,
@@ -73,116 +157,870 @@ def nullifier_serialize(nullifier):
     }
 
 
-@app.route('/')
+# Columns served by the read endpoints; the large proof column is never loaded.
+REVIEW_READ_COLUMNS = [
+    Review.id,
+    Review.text,
+    Review.rating,
+    Review.recommend,
+    Review.grade,
+    Review.professor_name,
+    Review.class_name,
+    Review.major,
+    Review.college,
+    Review.department,
+    Review.signature,
+    Review.public_keyX,
+    Review.public_keyY,
+]
+REVIEW_FILTERS = ["college", "department", "class_name", "professor_name"]
+READ_LIMIT_MAX = int(os.environ.get("READ_LIMIT_MAX", "1000"))
+
+def upsert_increment(model, key, increments):
+    """INSERT the row for *key*, or add *increments* to it if it already exists."""
+    if db.session.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    stmt = insert(model).values(**key, **increments)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(key),
+        set_={name: getattr(model, name) + getattr(stmt.excluded, name) for name in increments},
+    )
+    db.session.execute(stmt)
+
+def record_review_stats(review):
+    """Fold a new review into the aggregate tables, inside the caller's transaction."""
+    key = {name: getattr(review, name) or "" for name in STATS_KEY}
+    upsert_increment(ReviewStats, key, {
+        "review_count": 1,
+        "rating_sum": review.rating,
+        "recommend_count": 1 if review.recommend else 0,
+    })
+    upsert_increment(GradeStats, dict(key, grade=review.grade or ""), {"review_count": 1})
+
+def rebuild_stats():
+    """Recompute both aggregate tables from the review table."""
+    key_columns = [db.func.coalesce(getattr(Review, name), "") for name in STATS_KEY]
+    grade_column = db.func.coalesce(Review.grade, "")
+    db.session.execute(db.delete(GradeStats))
+    db.session.execute(db.delete(ReviewStats))
+    db.session.execute(db.insert(ReviewStats).from_select(
+        STATS_KEY + ["review_count", "rating_sum", "recommend_count"],
+        db.select(
+            *key_columns,
+            db.func.count(Review.id),
+            db.func.coalesce(db.func.sum(Review.rating), 0.0),
+            db.func.sum(db.case((Review.recommend, 1), else_=0)),
+        ).group_by(*key_columns),
+    ))
+    db.session.execute(db.insert(GradeStats).from_select(
+        STATS_KEY + ["grade", "review_count"],
+        db.select(*key_columns, grade_column, db.func.count(Review.id)).group_by(*key_columns, grade_column),
+    ))
+    db.session.commit()
+
+@bp.cli.command("rebuild-stats")
+def rebuild_stats_command():
+    """Rebuild the review aggregate tables from scratch."""
+    rebuild_stats()
+    print(f"Rebuilt stats for {db.session.query(ReviewStats).count()} groups")
+
+def review_query(args):
+    """Projected review select filtered by *args* and paginated by id.
+
+    Supports the ``REVIEW_FILTERS`` equality filters plus keyset pagination
+    with ``after_id`` and ``limit``. Returns ``(stmt, limit)``.
+    """
+    stmt = db.select(*REVIEW_READ_COLUMNS)
+    for name in REVIEW_FILTERS:
+        value = args.get(name)
+        if value:
+            stmt = stmt.where(getattr(Review, name) == value)
+
+    after_id = args.get("after_id", type=int)
+    if after_id is not None:
+        stmt = stmt.where(Review.id > after_id)
+
+    limit = args.get("limit", type=int)
+    if limit is not None:
+        limit = max(1, min(limit, READ_LIMIT_MAX))
+        stmt = stmt.limit(limit)
+    return stmt.order_by(Review.id), limit
+
+def page_headers(rows, limit):
+    """Keyset cursor header, set when a full page was returned."""
+    if limit is not None and len(rows) == limit:
+        return {"X-Next-After-Id": str(rows[-1].id)}
+    return {}
+
+def write_version():
+    """Monotonic version of the review table, shared by every worker process.
+
+    Read from the ``write_version`` row rather than ``max(review.id)``: ids
+    are allocated before commit, so on PostgreSQL a lower id can become
+    visible after a higher one without changing the maximum.
+    """
+    return db.session.execute(db.select(WriteVersion.version).where(WriteVersion.id == 1)).scalar() or 0
+
+def bump_write_version():
+    """Advance the write version inside the caller's transaction.
+
+    The UPDATE holds the row lock until commit, so concurrent writers commit
+    their versions in order and a reader never sees a version whose reviews
+    are not yet visible.
+    """
+    db.session.execute(
+        db.update(WriteVersion).where(WriteVersion.id == 1).values(version=WriteVersion.version + 1))
+
+response_cache = ResponseCache()
+
+def cached_response(build):
+    """Serve a read endpoint from the response cache.
+
+    *build* returns ``(payload, headers)`` and is only called when no entry
+    exists for the current query shape and write version. Clients sending a
+    matching ``If-None-Match`` get a 304 without the body being built.
+    """
+    version = write_version()
+    shape = request.path + "?" + urlencode(sorted(request.args.items(multi=True)))
+    use_gzip = bool(request.accept_encodings["gzip"])
+    etag = response_etag(shape, version, "gzip" if use_gzip else "identity")
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        entry = response_cache.get(shape, version)
+        if entry is None:
+            payload, headers = build()
+            entry = response_cache.put(shape, version, jsonify(payload).get_data(), headers)
+        if use_gzip:
+            response = Response(entry.gzip_body, mimetype="application/json")
+            response.headers["Content-Encoding"] = "gzip"
+        else:
+            response = Response(entry.body, mimetype="application/json")
+        response.headers.update(entry.headers)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    response.vary.add("Accept-Encoding")
+    return response
+
+STREAM_BATCH_SIZE = int(os.environ.get("STREAM_BATCH_SIZE", "1000"))
+
+def stream_mode():
+    """Return "ndjson", "json" or None depending on the request's streaming flags."""
+    if request.args.get("format") == "ndjson":
+        return "ndjson"
+    if request.args.get("stream") in ["1", "true", "True"]:
+        return "json"
+    return None
+
+def streamed_reviews(stmt):
+    """Iterate *stmt* in batches of ``STREAM_BATCH_SIZE`` rows, serializing as we go."""
+    for r in db.session.execute(stmt.limit(None).execution_options(yield_per=STREAM_BATCH_SIZE)):
+        yield review_serialize(r)
+
+def stream_response(chunks, mode):
+    mimetype = "application/x-ndjson" if mode == "ndjson" else "application/json"
+    return Response(stream_with_context(chunks), mimetype=mimetype)
+
+def stream_list(reviews, mode):
+    if mode == "ndjson":
+        for review in reviews:
+            yield current_app.json.dumps(review) + "\n"
+        return
+    yield "["
+    for i, review in enumerate(reviews):
+        yield ("," if i else "") + current_app.json.dumps(review)
+    yield "]"
+
+def group_key(value):
+    """College or department key of /read_reviews; NULL groups under "" as in the stats tables."""
+    return "" if value is None else value
+
+def stream_grouped(reviews):
+    """Stream ``{college: {department: [...]}}`` from reviews ordered by college, department."""
+    college = department = None
+    yield "{"
+    for review in reviews:
+        review_college, review_department = group_key(review["college"]), group_key(review["department"])
+        if review_college != college:
+            if college is not None:
+                yield "]},"
+            college, department = review_college, review_department
+            yield current_app.json.dumps(college) + ":{" + current_app.json.dumps(department) + ":["
+        elif review_department != department:
+            department = review_department
+            yield "]," + current_app.json.dumps(department) + ":["
+        else:
+            yield ","
+        yield current_app.json.dumps(review)
+    if college is not None:
+        yield "]}"
+    yield "}"
+
+@bp.route('/')
 def sample():
-    reviews = db.session.query(Review).all()
-    return jsonify([review_serialize(r) for r in reviews])
+    # Streaming responses cover the whole filtered result; limit is ignored.
+    mode = stream_mode()
+    if mode:
+        stmt, _ = review_query(request.args)
+        return stream_response(stream_list(streamed_reviews(stmt), mode), mode)
+
+    def build():
+        stmt, limit = review_query(request.args)
+        reviews = db.session.execute(stmt).all()
+        return [review_serialize(r) for r in reviews], page_headers(reviews, limit)
+    return cached_response(build)
+
+REVIEW_FIELDS = [
+    "text",
+    "rating",
+    "recommend",
+    "grade",
+    "professor_name",
+    "class_name",
+    "major",
+    "proof",
+    "department",
+    "college",
+    "signature",
+    "public_keyX",
+    "public_keyY"
+]
+
+# JSON types accepted per field; every other field must be a string.
+REVIEW_FIELD_TYPES = {
+    "rating": (str, int, float),
+    "recommend": (str, bool),
+}
+
+def parse_review(data):
+    return {arg_name: data.get(arg_name, "") for arg_name in REVIEW_FIELDS}
+
+def field_type_error(arg_dict):
+    """Name the first field whose JSON type cannot be stored, or None."""
+    for name, value in arg_dict.items():
+        if type(value) not in REVIEW_FIELD_TYPES.get(name, (str,)):
+            return f"Invalid field type: {name}"
+    return None
+
+def validate_review(arg_dict):
+    """Cheap payload checks done before a submission is queued."""
+    error = field_type_error(arg_dict)
+    if error:
+        return error
+    for field in ["proof", "signature", "public_keyX", "public_keyY"]:
+        if not arg_dict[field]:
+            return f"Missing field: {field}"
+    try:
+        bytes.fromhex(arg_dict["proof"].strip())
+    except (AttributeError, ValueError):
+        return "Invalid proof hex"
+    if get_registry().lookup(arg_dict["public_keyX"], arg_dict["public_keyY"]) is None:
+        return "Unknown public key"
+    return None
+
+def nullifier_digest(college, department, class_name, pk_x, pk_y):
+    """Compact nullifier key: sha256 over the course and the normalized public key."""
+    point = normalize_point(pk_x, pk_y)
+    pk = [str(c) for c in point] if point is not None else [str(pk_x).lower(), str(pk_y).lower()]
+    return hashlib.sha256("\0".join([college, department, class_name] + pk).encode()).hexdigest()
+
+def nullifier_fields(arg_dict):
+    nullifier_args = {
+        "college": arg_dict["college"],
+        "department": arg_dict["department"],
+        'class_name': arg_dict["class_name"],
+        "pk_x": arg_dict["public_keyX"],
+        "pk_y": arg_dict["public_keyY"]
+    }
+    nullifier_args["digest"] = nullifier_digest(**nullifier_args)
+    return nullifier_args
+
+_nullifier_filter = None
+_nullifier_filter_lock = threading.Lock()
+
+def get_nullifier_filter():
+    """Return the process-local nullifier Bloom filter, warming it from the database on first use."""
+    global _nullifier_filter
+    with _nullifier_filter_lock:
+        if _nullifier_filter is None:
+            nullifier_filter = NullifierFilter()
+            for digest in db.session.execute(db.select(Nulifier.digest).execution_options(yield_per=10000)).scalars():
+                nullifier_filter.add(digest)
+            print(f"Nullifier filter warmed: {nullifier_filter.stats()}")
+            _nullifier_filter = nullifier_filter
+    return _nullifier_filter
+
+def nullifier_used(nullifier_args):
+    # A definite miss skips the database; other processes' inserts are
+    # still caught by the UNIQUE digest on commit.
+    if not get_nullifier_filter().might_contain(nullifier_args["digest"]):
+        return False
+    return nullifier_in_db(nullifier_args)
+
+def nullifier_in_db(nullifier_args):
+    stmt = db.select(Nulifier.id).where(Nulifier.digest == nullifier_args["digest"]).limit(1)
+    return db.session.execute(stmt).first() is not None
+
+def select_vk(grade, major):
+    null_flag = "NOT_USED"
+    if grade == null_flag:
+        if major == null_flag:
+            vk = 0
+        else:
+            vk = 1
+    else:
+        if major == null_flag:
+            vk = 2
+        else:
+            vk = 3
+    return vk
+
+def check_review(arg_dict):
+    """Verify the public inputs, proof and signature of a review.
+
+    Does not touch the database, so it is safe to run on worker threads.
+    Returns an error message, or None if both checks pass.
+    """
+    signature = arg_dict["signature"]
+    pkX, pkY = arg_dict["public_keyX"], arg_dict["public_keyY"]
+    message = arg_dict["text"]
+
+    # Unknown keys are rejected before the expensive proof verification.
+    with timed(STAGE_SECONDS, stage="registry"):
+        public_key = get_registry().lookup(pkX, pkY)
+    if public_key is None:
+        return "Unknown public key"
+
+    vk = select_vk(arg_dict["grade"], arg_dict["major"])
+
+    proof = arg_dict["proof"]
+    if not proof:
+        return "Proof Verification Failed"
+
+    # Proofs whose public inputs cannot match the review never reach bb.
+    with timed(STAGE_SECONDS, stage="public_inputs"):
+        error, public_inputs = check_public_inputs(proof, vk, arg_dict, get_root_cache())
+    if error:
+        return error
+
+    with timed(STAGE_SECONDS, stage="verify"):
+        verified = verify_proof(proof, vk, tuple(public_inputs.values()))
+    if not verified:
+        return "Proof Verification Failed"
+
+    with timed(STAGE_SECONDS, stage="signature"):
+        signature_ok = check_signature(signature, pkX, pkY, message, public_key=public_key)
+    if not signature_ok:
+        return "Invalid Signature"
+    return None
+
+def record_outcome(body, status):
+    """Count a finished submission and, if rejected, its failure reason."""
+    if status == 201:
+        SUBMISSIONS.inc(result="accepted")
+        return
+    SUBMISSIONS.inc(result="rejected")
+    error = str(body.get("error", ""))
+    reason = FAILURE_REASONS.get(error) or FAILURE_REASONS.get(error.split(":")[0])
+    if reason is None:
+        if status == 400:
+            reason = "parse_error"
+        elif error.startswith("Verifier"):
+            reason = "verifier_error"
+        else:
+            reason = "error"
+    FAILURES.inc(reason=reason)
+
+def build_review(arg_dict):
+    arg_dict = dict(arg_dict)
+    try: arg_dict["rating"] = float(arg_dict["rating"]) 
+    except: arg_dict["rating"] = 1.0
 
-@app.route('/write_review', methods = ['POST'])
+    arg_dict["recommend"] = True if arg_dict["recommend"] in [True, "true", "True"] else False
+    return Review(**arg_dict)
+
+def add_review(arg_dict, nullifier_args):
+    """Stage a review, its nullifier and its aggregate updates in the current transaction."""
+    review = build_review(arg_dict)
+    db.session.add(Nulifier(**nullifier_args))
+    db.session.add(review)
+    record_review_stats(review)
+    bump_write_version()
+    return review
+
+def submit_review(arg_dict, ticket=None):
+    """Run the nullifier, proof and signature checks and store the review.
+
+    If *ticket* is given it is marked accepted in the review's transaction.
+    Returns a ``(body, status_code)`` pair.
+    """
+    nullifier_args = nullifier_fields(arg_dict)
+    with timed(STAGE_SECONDS, stage="nullifier"):
+        used = nullifier_used(nullifier_args)
+    if used:
+        return {"error": "Review already submitted - nullifier triggered"}, 500
+
+    error = check_review(arg_dict)
+    if error:
+        return {'error': error}, 500
+
+    # Review, nullifier and aggregates go in one transaction; the UNIQUE
+    # digest closes the race between the lookup above and this insert.
+    try:
+        with timed(STAGE_SECONDS, stage="commit"):
+            add_review(arg_dict, nullifier_args)
+            if ticket is not None:
+                finish_submission(ticket, {}, 201)
+            db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        get_nullifier_filter().add(nullifier_args["digest"])
+        return {"error": "Review already submitted - nullifier triggered"}, 500
+    get_nullifier_filter().add(nullifier_args["digest"])
+    
+    return {'message': 'Review added successfully'}, 201
+
+def create_submission(arg_dict):
+    """Store a pending ticket for *arg_dict* and return its ID."""
+    ticket = uuid.uuid4().hex
+    db.session.add(Submission(ticket=ticket, status="pending", payload=json.dumps(arg_dict),
+                              claimed_at=time.time()))
+    db.session.commit()
+    return ticket
+
+def finish_submission(ticket, body, status):
+    """Stage the outcome of a pending ticket in the current transaction."""
+    if status == 201:
+        values = {"status": "accepted", "reason": None}
+    else:
+        values = {"status": "rejected", "reason": body.get("error", "Unknown error")}
+    db.session.execute(
+        db.update(Submission)
+        .where(Submission.ticket == ticket, Submission.status == "pending")
+        .values(payload=None, finished_at=time.time(), **values)
+    )
+
+def process_submission(app, ticket, arg_dict):
+    with app.app_context():
+        try:
+            body, status = submit_review(arg_dict, ticket)
+        except Exception as e:
+            db.session.rollback()
+            body, status = {'error': str(e)}, 500
+        if status != 201:
+            try:
+                finish_submission(ticket, body, status)
+                db.session.commit()
+            except Exception:
+                # Left pending; retried once its lease expires.
+                db.session.rollback()
+                raise
+        record_outcome(body, status)
+        return body, status
+
+def recover_submissions(app):
+    """Claim pending tickets whose lease expired and drop old finished ones.
+
+    Returns ``(ticket, arg_dict)`` pairs for this process to run.
+    """
+    with app.app_context():
+        now = time.time()
+        db.session.execute(db.delete(Submission).where(
+            Submission.status != "pending", Submission.finished_at < now - SUBMISSION_RETAIN))
+        stale = db.session.execute(
+            db.select(Submission.ticket, Submission.claimed_at, Submission.payload)
+            .where(Submission.status == "pending", Submission.claimed_at < now - SUBMISSION_LEASE)
+            .limit(SUBMISSION_QUEUE_SIZE)
+        ).all()
+        claimed = []
+        for row in stale:
+            # Only one process wins the compare-and-set on claimed_at.
+            result = db.session.execute(
+                db.update(Submission)
+                .where(Submission.ticket == row.ticket, Submission.status == "pending",
+                       Submission.claimed_at == row.claimed_at)
+                .values(claimed_at=now)
+            )
+            if result.rowcount == 1:
+                claimed.append((row.ticket, json.loads(row.payload)))
+        db.session.commit()
+        return claimed
+
+@bp.route('/write_review', methods = ['POST'])
 @cross_origin(origins=['http://localhost:5173'])
 def write_review():
     # Verify proof 
     try:
-        data = request.get_json(silent=True)
-        if data is None:
-            data = request.form.to_dict()
-        if not data: return
-
-        arg_dict = {
-            arg_name: data.get(arg_name, "") for arg_name in [
-                "text",
-                "rating",
-                "recommend",
-                "grade",
-                "professor_name",
-                "class_name",
-                "major",
-                "proof",
-                "department",
-                "college",
-                "signature",
-                "public_keyX",
-                "public_keyY"
-            ]
-        }
-
-        nullifier_args = {
-            "college": arg_dict["college"],
-            "department": arg_dict["department"],
-            'class_name': arg_dict["class_name"],
-            "pk_x": arg_dict["public_keyX"],
-            "pk_y": arg_dict["public_keyY"]
-        }
-
-        stmt = (
-        db.select(Nulifier.id)       
-        .where(db.and_(
-            Nulifier.college    == nullifier_args["college"],
-            Nulifier.department == nullifier_args["department"],
-            Nulifier.class_name == nullifier_args["class_name"],
-            Nulifier.pk_x       == nullifier_args["pk_x"],
-            Nulifier.pk_y       == nullifier_args["pk_y"],
-        ))
-        .limit(1)
-    )
-
-        if db.session.execute(stmt).first() is not None:
-            return jsonify({"error": "Review already submitted - nullifier triggered"}), 500
-       
-        null_flag = "NOT_USED"
-        grade, major = arg_dict["grade"], arg_dict["major"]
-        if grade == null_flag:
-            if major == null_flag:
-                vk = 0
+        with timed(STAGE_SECONDS, stage="parse"):
+            data = request.get_json(silent=True)
+            if data is None:
+                data = request.form.to_dict()
+            arg_dict = parse_review(data) if data else None
+        if not data:
+            body, status = {"error": "Empty submission"}, 400
+        elif request.args.get("async") in ["1", "true", "True"]:
+            error = validate_review(arg_dict)
+            if error:
+                body, status = {"error": error}, 400
             else:
-                vk = 1
+                ticket = create_submission(arg_dict)
+                if current_app.extensions["submission_queue"].submit(ticket, arg_dict):
+                    # The outcome is counted when the ticket is processed.
+                    return jsonify({"ticket": ticket, "status": "pending"}), 202
+                db.session.execute(db.delete(Submission).where(Submission.ticket == ticket))
+                db.session.commit()
+                body, status = {"error": "Submission queue full, retry later"}, 503
+        elif field_type_error(arg_dict):
+            body, status = {"error": field_type_error(arg_dict)}, 400
         else:
-            if major == null_flag:
-                vk = 2
-            else:
-                vk = 3
-        
-        proof = arg_dict["proof"]
-        if not proof or not verify_proof(proof, vk):
-            return jsonify({'error': "Proof Verification Failed"}), 500
-        
-        signature = arg_dict["signature"]
-        pkX, pkY = arg_dict["public_keyX"], arg_dict["public_keyY"]
-        message = arg_dict["text"]
-
-        if not check_signature(signature, pkX, pkY, message):
-            return jsonify({"error": "Invalid Signature"}), 500
-
-        try: arg_dict["rating"] = float(arg_dict["rating"]) 
-        except: arg_dict["rating"] = 1.0
-
-        arg_dict["recommend"] = True if arg_dict["recommend"] in ["true", "True"] else False
-        
-        review = Review(**arg_dict)
-        db.session.add(review)
-        db.session.commit()
-
-        nullifier = Nulifier(**nullifier_args)
-        db.session.add(nullifier)
-        db.session.commit()
-        
-        return jsonify({'message': 'Review added successfully'}), 201
+            body, status = submit_review(arg_dict)
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        db.session.rollback()
+        body, status = {'error': str(e)}, 500
+    record_outcome(body, status)
+    return jsonify(body), status
+
+@bp.route('/write_reviews_batch', methods = ['POST'])
+@cross_origin(origins=['http://localhost:5173'])
+def write_reviews_batch():
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get("reviews")
+    if not isinstance(data, list) or not data:
+        return jsonify({"error": "Expected a non-empty list of reviews"}), 400
+    if len(data) > BATCH_MAX_SIZE:
+        return jsonify({"error": f"Batch larger than {BATCH_MAX_SIZE} reviews"}), 413
+
+    results = [None] * len(data)
+    items = {}
+    for i, item in enumerate(data):
+        if not isinstance(item, dict):
+            results[i] = {"error": "Malformed review"}, 400
+            continue
+        arg_dict = parse_review(item)
+        error = field_type_error(arg_dict)
+        if error:
+            results[i] = {"error": error}, 400
+            continue
+        # A bad item only fails its own slot.
+        try:
+            with timed(STAGE_SECONDS, stage="nullifier"):
+                used = nullifier_used(nullifier_fields(arg_dict))
+        except (TypeError, ValueError, AttributeError) as e:
+            results[i] = {"error": f"Malformed review: {e}"}, 400
+            continue
+        except Exception as e:
+            db.session.rollback()
+            results[i] = {"error": str(e)}, 500
+            continue
+        if used:
+            results[i] = {"error": "Review already submitted - nullifier triggered"}, 500
+            continue
+        items[i] = arg_dict
+
+    # Proof and signature checks are independent per item.
+    with ThreadPoolExecutor(max_workers=BATCH_VERIFY_THREADS) as executor:
+        futures = {i: executor.submit(check_review, arg_dict) for i, arg_dict in items.items()}
+        for i, future in futures.items():
+            try:
+                error = future.result()
+            except Exception as e:
+                error = str(e)
+            if error:
+                results[i] = {"error": error}, 500
+                del items[i]
 
-@app.route('/read_reviews', methods = ['GET'])
+    # Within the batch the first copy that passed its checks wins; the unique
+    # digest settles conflicts with other requests at commit.
+    seen = set()
+    for i, arg_dict in list(items.items()):
+        digest = nullifier_fields(arg_dict)["digest"]
+        if digest in seen:
+            results[i] = {"error": "Review already submitted - nullifier triggered"}, 500
+            del items[i]
+        else:
+            seen.add(digest)
+
+    # One transaction for the whole batch. If another request committed one
+    # of our nullifiers in the meantime, drop those items and retry once.
+    for attempt in range(2):
+        try:
+            with timed(STAGE_SECONDS, stage="batch_commit"):
+                for arg_dict in items.values():
+                    add_review(arg_dict, nullifier_fields(arg_dict))
+                db.session.commit()
+            for i, arg_dict in items.items():
+                get_nullifier_filter().add(nullifier_fields(arg_dict)["digest"])
+                results[i] = {"message": "Review added successfully"}, 201
+            break
+        except IntegrityError as e:
+            db.session.rollback()
+            if attempt == 0:
+                for i, arg_dict in list(items.items()):
+                    if nullifier_in_db(nullifier_fields(arg_dict)):
+                        results[i] = {"error": "Review already submitted - nullifier triggered"}, 500
+                        del items[i]
+                continue
+            for i in items:
+                results[i] = {"error": str(e)}, 500
+        except Exception as e:
+            db.session.rollback()
+            for i in items:
+                results[i] = {"error": str(e)}, 500
+            break
+
+    for body, status in results:
+        record_outcome(body, status)
+    return jsonify({"results": [
+        dict(body, index=i, status=status) for i, (body, status) in enumerate(results)
+    ]}), 200
+
+@bp.route('/submission/<ticket>', methods = ['GET'])
+@cross_origin(origins=['http://localhost:5173'])
+def submission_status(ticket):
+    submission = db.session.get(Submission, ticket)
+    if submission is None:
+        return jsonify({"error": "Unknown ticket"}), 404
+    body = {"ticket": submission.ticket, "status": submission.status}
+    if submission.status == "rejected":
+        body["reason"] = submission.reason
+    return jsonify(body)
+
+@bp.route('/read_reviews', methods = ['GET'])
 @cross_origin(origins=['http://localhost:5173'])
 def read_reviews():
-    reviews = Review.query.all()
-    result = defaultdict(lambda: defaultdict(list))
-    for r in reviews:
-        result[r.college][r.department].append(review_serialize(r))
+    mode = stream_mode()
+    if mode == "ndjson":
+        stmt, _ = review_query(request.args)
+        return stream_response(stream_list(streamed_reviews(stmt), mode), mode)
+    if mode:
+        stmt, _ = review_query(request.args)
+        # Order by the normalised keys so NULL and "" rows form one group.
+        stmt = stmt.order_by(None).order_by(db.func.coalesce(Review.college, ""),
+                                            db.func.coalesce(Review.department, ""), Review.id)
+        return stream_response(stream_grouped(streamed_reviews(stmt)), mode)
+
+    def build():
+        stmt, limit = review_query(request.args)
+        reviews = db.session.execute(stmt).all()
+        result = defaultdict(lambda: defaultdict(list))
+        for r in reviews:
+            result[group_key(r.college)][group_key(r.department)].append(review_serialize(r))
+        return result, page_headers(reviews, limit)
+    return cached_response(build)
+
 
+@bp.route('/stats', methods = ['GET'])
+@cross_origin(origins=['http://localhost:5173'])
+def stats():
+    stats_stmt = db.select(ReviewStats)
+    grades_stmt = db.select(GradeStats)
+    for name in STATS_KEY:
+        value = request.args.get(name)
+        if value:
+            stats_stmt = stats_stmt.where(getattr(ReviewStats, name) == value)
+            grades_stmt = grades_stmt.where(getattr(GradeStats, name) == value)
+
+    grades = defaultdict(dict)
+    for g in db.session.execute(grades_stmt).scalars():
+        grades[tuple(getattr(g, name) for name in STATS_KEY)][g.grade] = g.review_count
+
+    result = []
+    for s in db.session.execute(stats_stmt).scalars():
+        key = tuple(getattr(s, name) for name in STATS_KEY)
+        result.append(dict(
+            zip(STATS_KEY, key),
+            review_count=s.review_count,
+            average_rating=s.rating_sum / s.review_count if s.review_count else None,
+            recommend_ratio=s.recommend_count / s.review_count if s.review_count else None,
+            grades=grades[key],
+        ))
     return jsonify(result)
 
 
+def row_count(model):
+    return db.session.execute(db.select(db.func.count()).select_from(model)).scalar()
+
+def stat_samples(stats, key, **labels):
+    """Gauge samples for *key* of a stats() dict, skipped when the component is not running."""
+    return [(labels, stats[key])] if key in stats else []
+
+def cache_samples(key):
+    return (stat_samples(get_cache().stats(), key, cache="verify")
+            + stat_samples(response_cache.stats(), key, cache="response"))
+
+def filter_samples(key):
+    return stat_samples(_nullifier_filter.stats() if _nullifier_filter is not None else {}, key)
+
+def review_rows():
+    """Review count from the aggregate tables, without scanning the review table."""
+    return db.session.execute(db.select(db.func.coalesce(db.func.sum(ReviewStats.review_count), 0))).scalar()
+
+# Seconds a scrape reuses the row counts of the previous one.
+ROW_COUNT_TTL = float(os.environ.get("ROW_COUNT_TTL", "30"))
+_row_counts = {}
+
+def cached_count(name, count):
+    """Result of *count()*, recomputed at most every ROW_COUNT_TTL seconds."""
+    now = time.monotonic()
+    cached = _row_counts.get(name)
+    if cached is None or cached[0] <= now:
+        cached = _row_counts[name] = (now + ROW_COUNT_TTL, count())
+    return cached[1]
+
+# Row counts are the same from every process, so they are not published per pid.
+Gauge("review_rows", "Rows in the review table.", lambda: cached_count("review", review_rows), per_process=False)
+Gauge("nullifier_rows", "Rows in the nullifier table.",
+      lambda: cached_count("nullifier", partial(row_count, Nulifier)), per_process=False)
+Gauge("verifier_workers", "Verifier worker processes by state.",
+      lambda: stat_samples(pool_stats(), "size", state="total") + stat_samples(pool_stats(), "idle", state="idle"))
+CounterFunc("verifier_jobs_total", "Proofs sent to verifier workers.", lambda: stat_samples(pool_stats(), "jobs"))
+CounterFunc("verifier_busy_seconds_total", "Total time spent waiting on verifier workers.",
+      lambda: stat_samples(pool_stats(), "busy_seconds"))
+Gauge("verifier_last_seconds", "Duration of the most recent verifier job.",
+      lambda: stat_samples(pool_stats(), "last_seconds"))
+Gauge("cache_entries", "Entries held by each cache.", lambda: cache_samples("size"))
+Gauge("cache_memory_bytes", "Encoded bytes held by each cache.", lambda: cache_samples("bytes"))
+CounterFunc("cache_hits_total", "Hits of each cache.", lambda: cache_samples("hits"))
+CounterFunc("cache_misses_total", "Misses of each cache.", lambda: cache_samples("misses"))
+Gauge("nullifier_filter_entries", "Digests in the nullifier Bloom filter.", lambda: filter_samples("count"))
+Gauge("nullifier_filter_memory_bytes", "Memory used by the nullifier Bloom filter.",
+      lambda: filter_samples("memory_bytes"))
+Gauge("nullifier_filter_false_positive_rate", "Expected false-positive rate of the nullifier Bloom filter.",
+      lambda: filter_samples("false_positive_rate"))
+
+@bp.route('/metrics', methods = ['GET'])
+def metrics():
+    return Response(REGISTRY.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+@bp.before_app_request
+def start_timings():
+    if SERVER_TIMING:
+        g.request_start = time.perf_counter()
+        request_timings.set({})
+
+@bp.after_app_request
+def add_server_timing(response):
+    timings = request_timings.get()
+    if timings is not None:
+        timings["total"] = time.perf_counter() - g.request_start
+        response.headers["Server-Timing"] = server_timing(timings)
+        request_timings.set(None)
+    return response
+
+
+SEARCH_LIMIT_DEFAULT = 20
+
+@bp.route('/search', methods = ['GET'])
+@cross_origin(origins=['http://localhost:5173'])
+def search():
+    if db.engine.dialect.name != "sqlite":
+        return jsonify({"error": "Full-text search requires the SQLite backend"}), 501
+    query = match_query(request.args.get("q", ""))
+    if not query:
+        return jsonify({"error": "Missing search query"}), 400
+
+    limit = max(1, min(request.args.get("limit", SEARCH_LIMIT_DEFAULT, type=int), READ_LIMIT_MAX))
+    offset = max(0, request.args.get("offset", 0, type=int))
+
+    fts = db.table("review_fts", db.column("rowid"))
+    stmt = (
+        db.select(
+            *REVIEW_READ_COLUMNS,
+            db.literal_column("snippet(review_fts, -1, '[', ']', '...', 12)").label("snippet"),
+        )
+        .select_from(fts.join(Review.__table__, Review.id == fts.c.rowid))
+        .where(db.literal_column("review_fts").op("MATCH")(query))
+    )
+    for name in REVIEW_FILTERS:
+        value = request.args.get(name)
+        if value:
+            stmt = stmt.where(getattr(Review, name) == value)
+    stmt = stmt.order_by(db.literal_column("bm25(review_fts)"), Review.id).limit(limit).offset(offset)
+
+    rows = db.session.execute(stmt).all()
+    response = jsonify([dict(review_serialize(r), snippet=r.snippet) for r in rows])
+    if len(rows) == limit:
+        response.headers["X-Next-Offset"] = str(offset + limit)
+    return response
+
+
+def migrate_nullifier_digest():
+    """Add and backfill the nullifier digest column on databases created before it existed."""
+    columns = [c["name"] for c in db.inspect(db.engine).get_columns("nullifier")]
+    if "digest" in columns:
+        return
+
+    db.session.execute(db.text("ALTER TABLE nullifier ADD COLUMN digest VARCHAR(64)"))
+    rows = db.session.execute(db.select(
+        Nulifier.id, Nulifier.college, Nulifier.department, Nulifier.class_name, Nulifier.pk_x, Nulifier.pk_y
+    )).all()
+    seen = set()
+    for row in rows:
+        digest = nullifier_digest(row.college, row.department, row.class_name, row.pk_x, row.pk_y)
+        if digest in seen:
+            db.session.execute(db.delete(Nulifier).where(Nulifier.id == row.id))
+            continue
+        seen.add(digest)
+        db.session.execute(db.update(Nulifier).where(Nulifier.id == row.id).values(digest=digest))
+    db.session.execute(db.text("CREATE UNIQUE INDEX ix_nullifier_digest ON nullifier (digest)"))
+    db.session.commit()
+
+@bp.cli.command("rebuild-search")
+def rebuild_search_command():
+    """Rebuild the full-text search index from the review table."""
+    with db.engine.begin() as connection:
+        init_search(connection)
+        rebuild_search(connection)
+    print("Rebuilt review search index")
+
+def init_db():
+    """Create missing tables and bring older databases up to date."""
+    db.create_all()
+    if db.engine.dialect.name == "sqlite":
+        with db.engine.begin() as connection:
+            if init_search(connection):
+                rebuild_search(connection)
+    migrate_nullifier_digest()
+    if db.session.get(WriteVersion, 1) is None:
+        # Start from the old max(review.id) version so no earlier ETag is reissued.
+        latest = db.session.execute(db.select(db.func.max(Review.id))).scalar() or 0
+        db.session.add(WriteVersion(id=1, version=latest))
+        db.session.commit()
+    # create_all() skips indexes on tables that already exist.
+    for index in Review.__table__.indexes:
+        index.create(db.engine, checkfirst=True)
+    # Databases that predate the aggregate tables get them filled once.
+    if db.session.query(ReviewStats).first() is None and db.session.query(Review.id).first() is not None:
+        rebuild_stats()
+
+@bp.cli.command("init-db")
+def init_db_command():
+    """Create the schema and run pending migrations."""
+    init_db()
+    print("Database initialized")
+
+def create_app(database_url=DATABASE_URL):
+    """Build the review app. The schema is not touched; run init_db() once per deployment."""
+    app = Flask(__name__)
+    # Allow CORS from any origin on all routes
+    CORS(app, origins=["http://localhost:5173"], expose_headers=["X-Next-After-Id", "X-Next-Offset", "ETag"])
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(database_url)
+    app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
+    db.init_app(app)
+    app.register_blueprint(bp)
+    app.extensions["submission_queue"] = SubmissionQueue(partial(process_submission, app),
+                                                         recover=partial(recover_submissions, app))
+    return app
+
+# Module-level app for `flask --app backend` and existing imports.
+app = create_app()
+
+
 if __name__ == '__main__':
-    if not os.path.exists("data.sqlite"):
-        with app.app_context(): 
-            db.create_all()      
+    with app.app_context(): 
+        init_db()
     app.run(debug=True, port=5001)
\ No newline at end of file
@@ -0,0 +1,352 @@
+"""Self-contained load test for the review backend.
+
+Runs entirely on the local machine: a scratch SQLite database, freshly
+generated SECP256R1 keys (as in ``generate_key_pair.py``) registered through a
+scratch ``parsed_keys.json``, and ``stub_bb.py`` in place of Barretenberg. For
+each database size the table is bulk-seeded up to that many reviews, then
+``/write_review`` throughput and ``/read_reviews`` latency are measured
+through the WSGI app. Each size runs in its own subprocess, so its peak RSS
+is not inherited from smaller sizes. Results are written as JSON so runs can
+be compared across commits.
+
+    python benchmark.py --sizes 10k,100k,1M --writes 500 --output results.json
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import resource
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+
+COURSES_FILE = os.path.join(basedir, "..", "zero_knowledge", "tree_creation", "courses.csv")
+PROFESSORS = ["Dr. Alice Smith", "Dr. Bob Johnson", "Dr. Carol Williams", "Dr. David Brown",
+              "Dr. Emma Davis", "Dr. Frank Miller", "Dr. Grace Wilson", "Dr. Henry Moore"]
+GRADES = ["F", "D", "C-", "C", "C+", "B-", "B", "B+", "A-", "A"]
+WORDS = ["lectures", "exams", "homework", "labs", "clear", "hard", "fair", "engaging",
+         "boring", "helpful", "curve", "project", "office", "hours", "recommend", "tough"]
+SEED_CHUNK = 20000
+BENCH_ROOT = 0x04c904ec344f5d4b7c6dd0f82605c7aa698f8775feb2238ac48903378159c5a3
+
+
+def parse_size(value: str) -> int:
+    value = value.strip().lower()
+    for suffix, factor in (("k", 1000), ("m", 1000000)):
+        if value.endswith(suffix):
+            return int(float(value[:-1]) * factor)
+    return int(value)
+
+
+def load_courses(path: str = COURSES_FILE) -> list:
+    """Distinct (college, department, course) triples from courses.csv."""
+    import csv
+    with open(path, newline="") as f:
+        rows = {(r["college"], r["department"], r["course_number"]) for r in csv.DictReader(f)}
+    return sorted(rows)
+
+
+def generate_keys(count: int) -> list:
+    return [ec.generate_private_key(ec.SECP256R1()) for _ in range(count)]
+
+
+def write_parsed_keys(keys: list, path: str) -> None:
+    """Write *keys* in the parse_pks.py format read by key_registry."""
+    def split(n):
+        return f"0x{n >> 128:032x}", f"0x{n & ((1 << 128) - 1):032x}"
+
+    result = {}
+    for i, key in enumerate(keys):
+        numbers = key.public_key().public_numbers()
+        x_hi, x_lo = split(numbers.x)
+        y_hi, y_lo = split(numbers.y)
+        result[f"KEY_{i}"] = {"pk_x_hi": x_hi, "pk_x_lo": x_lo, "pk_y_hi": y_hi, "pk_y_lo": y_lo}
+    with open(path, "w") as f:
+        json.dump(result, f, indent=4)
+
+
+def random_text(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 30)))
+
+
+def random_proof(payload: dict, rng: random.Random) -> str:
+    """A no-grade/no-major proof whose public inputs match *payload*.
+
+    The proof section is random, so verification is never a cache hit.
+    """
+    from public_inputs import PROOF_FIELDS, PUBLIC_INPUTS, expected_public_inputs
+    inputs = dict(expected_public_inputs(payload, 0), rootSchool=BENCH_ROOT)
+    fields = [inputs[name] for name in PUBLIC_INPUTS[0]]
+    return (struct.pack(">I", len(fields) + PROOF_FIELDS)
+            + b"".join(f.to_bytes(32, "big") for f in fields)
+            + rng.randbytes(32 * PROOF_FIELDS)).hex()
+
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def latency_summary(seconds: list) -> dict:
+    return {
+        "count": len(seconds),
+        "p50_ms": percentile(seconds, 0.50) * 1000,
+        "p99_ms": percentile(seconds, 0.99) * 1000,
+        "mean_ms": sum(seconds) / len(seconds) * 1000 if seconds else 0.0,
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=basedir, capture_output=True,
+                               text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+class Benchmark:
+    def __init__(self, args, courses: list, keys: list):
+        # Imported here so the environment set up in main() is in effect.
+        import backend
+        self.backend = backend
+        self.args = args
+        self.courses = courses
+        self.keys = keys
+        self.rng = random.Random(args.seed)
+        self.app = backend.create_app()
+        with self.app.app_context():
+            backend.init_db()
+        self.write_index = 0
+
+    def row_count(self) -> int:
+        with self.app.app_context():
+            return self.backend.row_count(self.backend.Review)
+
+    def seed(self, target: int) -> float:
+        """Bulk-insert synthetic reviews and nullifiers until there are *target* reviews."""
+        backend, db = self.backend, self.backend.db
+        start = time.perf_counter()
+        with self.app.app_context():
+            current = backend.row_count(backend.Review)
+            while current < target:
+                reviews, nullifiers = [], []
+                for i in range(current, min(target, current + SEED_CHUNK)):
+                    college, department, course = self.rng.choice(self.courses)
+                    class_name = f"{department} {course}"
+                    pk_x, pk_y = f"0x{i:064x}", f"0x{self.rng.getrandbits(256):064x}"
+                    reviews.append({
+                        "text": random_text(self.rng),
+                        "rating": float(self.rng.randint(1, 5)),
+                        "recommend": self.rng.random() < 0.6,
+                        "grade": self.rng.choice(GRADES + ["NOT_USED"]),
+                        "professor_name": self.rng.choice(PROFESSORS),
+                        "class_name": class_name,
+                        "major": "NOT_USED",
+                        "proof": "",
+                        "college": college,
+                        "department": department,
+                        "signature": "",
+                        "public_keyX": pk_x,
+                        "public_keyY": pk_y,
+                    })
+                    nullifiers.append(dict(
+                        college=college, department=department, class_name=class_name, pk_x=pk_x, pk_y=pk_y,
+                        digest=hashlib.sha256(f"seed\0{i}".encode()).hexdigest(),
+                    ))
+                db.session.execute(db.insert(backend.Review), reviews)
+                db.session.execute(db.insert(backend.Nulifier), nullifiers)
+                backend.bump_write_version()
+                db.session.commit()
+                current += len(reviews)
+                print(f"  seeded {current}/{target}", file=sys.stderr)
+            backend.rebuild_stats()
+        return time.perf_counter() - start
+
+    def submission(self) -> dict:
+        """A fresh, correctly signed review for an enrolled key and unused course."""
+        i = self.write_index
+        self.write_index += 1
+        key = self.keys[i // len(self.courses)]
+        college, department, course = self.courses[i % len(self.courses)]
+        text = f"benchmark review {i}: " + random_text(self.rng)
+        numbers = key.public_key().public_numbers()
+        payload = {
+            "text": text,
+            "rating": str(self.rng.randint(1, 5)),
+            "recommend": "true",
+            "grade": "NOT_USED",
+            "major": "NOT_USED",
+            "professor_name": self.rng.choice(PROFESSORS),
+            "class_name": f"{department} {course}",
+            "proof": "",
+            "college": college,
+            "department": department,
+            "signature": key.sign(text.encode(), ec.ECDSA(hashes.SHA256())).hex(),
+            "public_keyX": hex(numbers.x),
+            "public_keyY": f"{numbers.y:064x}",
+        }
+        payload["proof"] = random_proof(payload, self.rng)
+        return payload
+
+    def measure_writes(self) -> dict:
+        payloads = [self.submission() for _ in range(self.args.writes)]
+        statuses = {}
+        lock = threading.Lock()
+        latencies = []
+        local = threading.local()
+
+        def post(payload):
+            client = getattr(local, "client", None)
+            if client is None:
+                client = local.client = self.app.test_client()
+            start = time.perf_counter()
+            response = client.post("/write_review", json=payload)
+            elapsed = time.perf_counter() - start
+            with lock:
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                latencies.append(elapsed)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.args.concurrency) as executor:
+            list(executor.map(post, payloads))
+        elapsed = time.perf_counter() - start
+        return dict(latency_summary(latencies), seconds=elapsed,
+                    per_second=len(payloads) / elapsed if elapsed else 0.0,
+                    statuses={str(k): v for k, v in sorted(statuses.items())})
+
+    def measure_reads(self, max_id: int) -> dict:
+        """Filtered page reads; cold reads use a fresh cursor so the response cache misses.
+
+        ``full`` and ``full_stream`` read the whole table unfiltered, buffered
+        and streamed, as a client without pagination would.
+        """
+        client = self.app.test_client()
+        cold, warm = [], []
+        for i in range(self.args.reads):
+            college, department, course = self.rng.choice(self.courses)
+            query = {"college": college, "department": department,
+                     "class_name": f"{department} {course}", "limit": 100}
+            for bucket, params in ((cold, dict(query, after_id=self.rng.randint(0, max_id))), (warm, query)):
+                start = time.perf_counter()
+                response = client.get("/read_reviews", query_string=params)
+                response.get_data()
+                bucket.append(time.perf_counter() - start)
+        result = {"cold": latency_summary(cold), "warm": latency_summary(warm)}
+        for name, params in (("full", {}), ("full_stream", {"stream": "1"})):
+            seconds, size = [], 0
+            for i in range(self.args.full_reads):
+                start = time.perf_counter()
+                response = client.get("/read_reviews", query_string=params)
+                size = len(response.get_data())
+                seconds.append(time.perf_counter() - start)
+            result[name] = dict(latency_summary(seconds), bytes=size)
+        return result
+
+    def run_size(self, size: int) -> dict:
+        print(f"size {size}", file=sys.stderr)
+        seed_seconds = self.seed(size)
+        if self.args.tracemalloc:
+            tracemalloc.start()
+        writes = self.measure_writes()
+        reads = self.measure_reads(self.row_count())
+        # This process only ever ran this size, so the lifetime peak is the size's peak.
+        memory = {"max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+        if self.args.tracemalloc:
+            memory["traced_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        return {"size": size, "rows": self.row_count(), "seed_seconds": seed_seconds,
+                "write_review": writes, "read_reviews": reads, "memory": memory}
+
+
+def run_child(args) -> None:
+    """Measure one size (``--run-size``) and write its result to ``--output``."""
+    courses = load_courses()
+    workdir = args.workdir
+    # One key per len(courses) submissions keeps every nullifier fresh; each
+    # size registers its own keys, so earlier sizes' submissions never collide.
+    keys = generate_keys(-(-args.writes // len(courses)))
+    keys_file = os.path.join(workdir, f"parsed_keys_{args.run_size}.json")
+    write_parsed_keys(keys, keys_file)
+
+    os.environ.update({
+        "DATABASE_URL": "sqlite:///" + os.path.join(workdir, "bench.sqlite"),
+        "PARSED_KEYS_FILE": keys_file,
+        "BB_BINARY": f"{sys.executable} {os.path.join(basedir, 'stub_bb.py')}",
+        "STUB_BB_DELAY": str(args.stub_delay),
+        "STUB_BB_RESULT": args.stub_result,
+        "VERIFIER_WORKERS": str(args.verifier_workers),
+        "SCHOOL_ROOTS": f"bench=0x{BENCH_ROOT:064x}",
+    })
+    sys.path.insert(0, basedir)
+
+    args.seed += args.run_size
+    bench = Benchmark(args, courses, keys)
+    result = bench.run_size(args.run_size)
+    with open(args.output, "w") as f:
+        json.dump(result, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the review backend against a stub verifier.")
+    parser.add_argument("--sizes", default="10k,100k,1M", help="Comma-separated database sizes")
+    parser.add_argument("--writes", type=int, default=500, help="Submissions per size")
+    parser.add_argument("--reads", type=int, default=500, help="Reads per size (each cold and warm)")
+    parser.add_argument("--full-reads", type=int, default=3,
+                        help="Unfiltered full-table reads per size (each buffered and streamed)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent submitting threads")
+    parser.add_argument("--verifier-workers", type=int, default=4)
+    parser.add_argument("--stub-delay", type=float, default=0.0, help="Seconds per stub bb call")
+    parser.add_argument("--stub-result", choices=["pass", "fail"], default="pass")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tracemalloc", action="store_true", help="Also trace Python allocation peaks")
+    parser.add_argument("--workdir", help="Directory for the scratch database and keys (default: temporary)")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--run-size", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_size is not None:
+        run_child(args)
+        return
+
+    sizes = sorted(parse_size(s) for s in args.sizes.split(","))
+    workdir = args.workdir or tempfile.mkdtemp(prefix="review-bench-")
+    os.makedirs(workdir, exist_ok=True)
+
+    results = []
+    for size in sizes:
+        # The scratch database persists, so each child only seeds the difference.
+        result_file = os.path.join(workdir, f"result_{size}.json")
+        child = subprocess.run([sys.executable, os.path.abspath(__file__), *sys.argv[1:],
+                                "--workdir", workdir, "--run-size", str(size), "--output", result_file])
+        if child.returncode != 0:
+            raise SystemExit(f"Benchmark for size {size} failed with exit code {child.returncode}")
+        with open(result_file) as f:
+            results.append(json.load(f))
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": sys.version.split()[0],
+        "config": {k: v for k, v in vars(args).items() if k not in ["output", "workdir", "run_size"]},
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    print(f"Scratch data in {workdir}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
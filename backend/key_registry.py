@@ -0,0 +1,102 @@
+import json
+import os
+import threading
+
+from cryptography.hazmat.primitives.asymmetric import ec
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+
+# Enrolled keys as written by zero_knowledge/tree_creation/parse_pks.py.
+PARSED_KEYS_FILE = os.environ.get(
+    "PARSED_KEYS_FILE",
+    os.path.join(basedir, "..", "zero_knowledge", "tree_creation", "parsed_keys.json"),
+)
+
+
+def parse_coordinate(value: str) -> int:
+    """Parse a hex coordinate with or without a 0x prefix."""
+    value = value.strip()
+    if value[:2] in ("0x", "0X"):
+        value = value[2:]
+    return int(value, 16)
+
+
+def normalize_point(pkX: str, pkY: str):
+    """Return the (x, y) integer pair for hex coordinates, or None if malformed."""
+    try:
+        return parse_coordinate(pkX), parse_coordinate(pkY)
+    except (AttributeError, ValueError):
+        return None
+
+
+class KeyRegistry:
+    """Index of enrolled public keys, keyed by normalized (x, y).
+
+    Holds ready-made ``EllipticCurvePublicKey`` objects so signature checks
+    skip point decoding, and reloads the key file when its mtime changes.
+    """
+
+    def __init__(self, path: str = PARSED_KEYS_FILE):
+        self.path = path
+        self._keys = {}
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict:
+        with open(self.path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+
+        keys = {}
+        for name, entry in entries.items():
+            x = (int(entry["pk_x_hi"], 16) << 128) | int(entry["pk_x_lo"], 16)
+            y = (int(entry["pk_y_hi"], 16) << 128) | int(entry["pk_y_lo"], 16)
+            try:
+                keys[(x, y)] = ec.EllipticCurvePublicNumbers(x, y, ec.SECP256R1()).public_key()
+            except ValueError as e:
+                print(f"Skipping invalid key {name}: {e}")
+        return keys
+
+    def refresh(self) -> None:
+        """Reload the key file if it changed since the last load."""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            if mtime is None:
+                print(f"Key file {self.path} not found, no keys enrolled")
+                self._keys = {}
+            else:
+                self._keys = self._load()
+            self._mtime = mtime
+
+    def lookup(self, pkX: str, pkY: str):
+        """Return the public key object for the given coordinates, or None if not enrolled."""
+        self.refresh()
+        point = normalize_point(pkX, pkY)
+        if point is None:
+            return None
+        return self._keys.get(point)
+
+    def __len__(self):
+        self.refresh()
+        return len(self._keys)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> KeyRegistry:
+    """Return the process-wide key registry, loading it on first use."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = KeyRegistry()
+            _registry.refresh()
+    return _registry
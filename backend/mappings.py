@@ -0,0 +1,67 @@
+"""Review field to circuit input codes.
+
+Mirrors frontend/student/student-frontend/src/mappings.js; keep the two in
+sync, since the proofs' public inputs are built from the frontend copy.
+"""
+
+PROFESSOR_CODES = {
+    "Dr. Alice Smith": 0,
+    "Dr. Bob Johnson": 1,
+    "Dr. Carol Williams": 2,
+    "Dr. David Brown": 3,
+    "Dr. Emma Davis": 4,
+    "Dr. Frank Miller": 5,
+    "Dr. Grace Wilson": 6,
+    "Dr. Henry Moore": 7,
+}
+
+GRADES = ["F", "D", "C-", "C", "C+", "B-", "B", "B+", "A-", "A"]
+
+GRADE_CODES = {grade: i for i, grade in enumerate(GRADES)}
+
+COURSE_FIXED = {
+    "ENG": {"101": 0, "102": 1, "201": 2, "202": 3, "301": 4, "302": 5},
+    "CAS": {"101": 0, "102": 1, "201": 2, "202": 3, "301": 4, "302": 5, "595": 6},
+}
+
+collegeMap = {
+    "ENG": 0,
+    "CAS": 1,
+}
+
+COLLEGES = ["ENG", "CAS"]
+
+departmentMap = {
+    "ENG": {
+        "Mechanical Engineering": 0,
+        "Biomedical Engineering": 1,
+        "Electrical and Computer Engineering": 2,
+        "Systems Engineering": 3,
+    },
+    "CAS": {
+        "English": 0,
+        "Economics": 1,
+        "Mathematics": 2,
+        "Computer Science": 3,
+    },
+}
+
+_MAJORS = {
+    "Biomedical Engineering": 0,
+    "Systems Engineering": 1,
+    "English": 2,
+    "Computer Science": 3,
+    "Mechanical Engineering": 4,
+    "Economics": 5,
+    "Electrical and Computer Engineering ": 6,
+    "Mathematics": 7,
+}
+
+majorMap = {
+    "ENG": dict(_MAJORS),
+    "CAS": dict(_MAJORS),
+}
+
+COLLEGE_MULT = 1 << 15
+DEPT_MULT = 1 << 12
+COURSE_MULT = 1 << 9
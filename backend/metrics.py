@@ -0,0 +1,403 @@
+import bisect
+import glob
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Add a Server-Timing header with the per-stage durations of each request.
+SERVER_TIMING = os.environ.get("SERVER_TIMING", "0") in ["1", "true", "True"]
+
+# Seconds; the upper buckets cover slow proof verifications.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Directory shared by pre-forked workers (serve.py). When set, counters and
+# histograms live in one mmap'ed file per process and /metrics sums them
+# over all processes, like prometheus_client's multiprocess mode.
+METRICS_DIR = os.environ.get("METRICS_DIR")
+# Seconds between publishing each process's callback metrics to METRICS_DIR.
+METRICS_PUBLISH_INTERVAL = float(os.environ.get("METRICS_PUBLISH_INTERVAL", "5"))
+
+# Stage durations of the current request, or None when not collecting.
+request_timings = ContextVar("request_timings", default=None)
+
+
+def format_value(value) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    items = []
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        items.append(f'{name}="{value}"')
+    return "{" + ",".join(items) + "}"
+
+
+class ValueStore:
+    """Float values by string key in an mmap'ed file that other processes can read.
+
+    Layout: an 8-byte header holding the number of bytes in use, then entries
+    of a 4-byte key length, the UTF-8 key padded to 8-byte alignment and an
+    8-byte double. The header is only advanced once an entry is complete.
+    """
+
+    def __init__(self, path: str, initial_size: int = 64 * 1024):
+        self.path = path
+        self.pid = os.getpid()
+        self._positions = {}
+        self._lock = threading.Lock()
+        self._file = open(path, "w+b")
+        self._file.truncate(initial_size)
+        self._mmap = mmap.mmap(self._file.fileno(), initial_size)
+        self._used = 8
+        struct.pack_into("<Q", self._mmap, 0, self._used)
+
+    def _position(self, key: str) -> int:
+        position = self._positions.get(key)
+        if position is None:
+            encoded = key.encode()
+            padded = len(encoded) + (-(len(encoded) + 4) % 8)
+            end = self._used + 4 + padded + 8
+            if end > len(self._mmap):
+                size = max(end, 2 * len(self._mmap))
+                self._file.truncate(size)
+                self._mmap.close()
+                self._mmap = mmap.mmap(self._file.fileno(), size)
+            struct.pack_into(f"<I{padded}sd", self._mmap, self._used, len(encoded), encoded, 0.0)
+            position = self._positions[key] = end - 8
+            self._used = end
+            struct.pack_into("<Q", self._mmap, 0, self._used)
+        return position
+
+    def add(self, key: str, amount: float) -> None:
+        with self._lock:
+            position = self._position(key)
+            struct.pack_into("<d", self._mmap, position, struct.unpack_from("<d", self._mmap, position)[0] + amount)
+
+    def set(self, key: str, value: float) -> None:
+        with self._lock:
+            struct.pack_into("<d", self._mmap, self._position(key), value)
+
+    @staticmethod
+    def read(path: str) -> dict:
+        with open(path, "rb") as f:
+            data = f.read()
+        values = {}
+        if len(data) < 8:
+            return values
+        used, position = min(struct.unpack_from("<Q", data)[0], len(data)), 8
+        while position + 4 <= used:
+            size = struct.unpack_from("<I", data, position)[0]
+            padded = size + (-(size + 4) % 8)
+            key = data[position + 4:position + 4 + size].decode()
+            values[key] = struct.unpack_from("<d", data, position + 4 + padded)[0]
+            position += 4 + padded + 8
+        return values
+
+
+ProcessValues = namedtuple("ProcessValues", ["pid", "live", "values"])
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def process_store() -> ValueStore:
+    """This process's ValueStore in METRICS_DIR, opened anew after a fork."""
+    global _store
+    with _store_lock:
+        if _store is None or _store.pid != os.getpid():
+            # The start time keeps a reused pid from writing into a dead process's totals.
+            _store = ValueStore(os.path.join(METRICS_DIR, f"metrics_{os.getpid()}_{time.time_ns()}.db"))
+    return _store
+
+
+def store_files() -> list:
+    """``(path, pid, start time)`` of every process file in METRICS_DIR."""
+    files = []
+    for path in glob.glob(os.path.join(METRICS_DIR, "metrics_*.db")):
+        _, pid, started = os.path.basename(path)[:-len(".db")].split("_")
+        files.append((path, int(pid), int(started)))
+    return files
+
+
+def pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def read_stores() -> list:
+    """Values of every process file in METRICS_DIR, grouped by metric name.
+
+    Files of exited processes are kept so their counter totals still count.
+    """
+    files = store_files()
+    newest = {}
+    for _, pid, started in files:
+        newest[pid] = max(newest.get(pid, started), started)
+    stores = []
+    for path, pid, started in files:
+        try:
+            values = ValueStore.read(path)
+        except FileNotFoundError:
+            continue
+        by_name = {}
+        for key, value in values.items():
+            name, *rest = json.loads(key)
+            by_name.setdefault(name, []).append((rest, value))
+        stores.append(ProcessValues(pid, newest[pid] == started and pid_alive(pid), by_name))
+    return stores
+
+
+def clear_metrics_dir() -> None:
+    """Remove the process files of an earlier run; call before forking workers."""
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    for path, _, _ in store_files():
+        os.remove(path)
+
+
+class Registry:
+    """Ordered collection of metrics rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        stores = None
+        if METRICS_DIR:
+            self.publish()
+            stores = read_stores()
+        for metric in self._metrics:
+            try:
+                samples = list(metric.samples(stores))
+            except Exception as e:
+                print(f"Skipping metric {metric.name}: {e}")
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in samples:
+                lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def publish(self) -> None:
+        """Write this process's callback metrics to its METRICS_DIR file."""
+        for metric in self._metrics:
+            if hasattr(metric, "publish"):
+                try:
+                    metric.publish()
+                except Exception as e:
+                    print(f"Not publishing metric {metric.name}: {e}")
+
+
+REGISTRY = Registry()
+
+
+def start_publisher(registry: Registry = REGISTRY, interval: float = METRICS_PUBLISH_INTERVAL):
+    """Publish *registry* every *interval* seconds from a daemon thread, if METRICS_DIR is set."""
+    if not METRICS_DIR:
+        return None
+
+    def run():
+        while True:
+            time.sleep(interval)
+            registry.publish()
+
+    thread = threading.Thread(target=run, name="metrics-publisher", daemon=True)
+    thread.start()
+    return thread
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames=(), registry: Registry = REGISTRY):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(labels[name] for name in self.labelnames)
+        if METRICS_DIR:
+            process_store().add(json.dumps([self.name, key]), amount)
+            return
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self, stores=None):
+        if stores is None:
+            with self._lock:
+                values = sorted(self._values.items())
+        else:
+            totals = {}
+            for store in stores:
+                for (key,), value in store.values.get(self.name, ()):
+                    totals[tuple(key)] = totals.get(tuple(key), 0) + value
+            values = sorted(totals.items())
+        for key, value in values:
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Histogram:
+    """Cumulative-bucket histogram, one series per label combination."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames=(), buckets=DEFAULT_BUCKETS,
+                 registry: Registry = REGISTRY):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(labels[name] for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        if METRICS_DIR:
+            store = process_store()
+            store.add(json.dumps([self.name, key, index]), 1)
+            store.add(json.dumps([self.name, key, "sum"]), value)
+            store.add(json.dumps([self.name, key, "count"]), 1)
+            return
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket counts (last one is +Inf), sum, count.
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self, stores=None):
+        if stores is None:
+            with self._lock:
+                series = sorted((key, [list(s[0]), s[1], s[2]]) for key, s in self._series.items())
+        else:
+            merged = {}
+            for store in stores:
+                for (key, field), value in store.values.get(self.name, ()):
+                    s = merged.setdefault(tuple(key), [[0] * (len(self.buckets) + 1), 0.0, 0])
+                    if field == "sum":
+                        s[1] += value
+                    elif field == "count":
+                        s[2] += int(value)
+                    else:
+                        s[0][field] += int(value)
+            series = sorted(merged.items())
+        for key, (counts, total, count) in series:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                yield self.name + "_bucket", dict(labels, le=format_value(bound)), cumulative
+            yield self.name + "_sum", labels, total
+            yield self.name + "_count", labels, count
+
+
+class Gauge:
+    """Gauge read at scrape time from *collect*.
+
+    *collect* returns a number, or an iterable of ``(labels, value)`` pairs.
+    With METRICS_DIR set, a *per_process* gauge is published by every live
+    process and reported with a ``pid`` label; other gauges (e.g. database
+    row counts) are read by the scraped process alone.
+    """
+
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, collect, registry: Registry = REGISTRY, per_process: bool = True):
+        self.name = name
+        self.help = help
+        self.collect = collect
+        self.per_process = per_process
+        registry.register(self)
+
+    def collected(self):
+        values = self.collect()
+        if isinstance(values, (int, float)):
+            values = [({}, values)]
+        return list(values)
+
+    def publish(self) -> None:
+        if self.per_process:
+            store = process_store()
+            for labels, value in self.collected():
+                store.set(json.dumps([self.name, labels]), value)
+
+    def samples(self, stores=None):
+        if stores is None or not self.per_process:
+            for labels, value in self.collected():
+                yield self.name, labels, value
+            return
+        for store in sorted(stores, key=lambda s: s.pid):
+            if store.live:
+                for (labels,), value in store.values.get(self.name, ()):
+                    yield self.name, dict(labels, pid=store.pid), value
+
+
+class CounterFunc(Gauge):
+    """Counter read at scrape time from *collect*, for totals kept by another component.
+
+    *collect* must only ever grow per label set (until the process restarts).
+    With METRICS_DIR set, the last totals published by every process,
+    including exited ones, are summed.
+    """
+
+    type = "counter"
+
+    def samples(self, stores=None):
+        if stores is None:
+            yield from super().samples()
+            return
+        totals = {}
+        for store in stores:
+            for (labels,), value in store.values.get(self.name, ()):
+                key = tuple(labels.items())
+                totals[key] = totals.get(key, 0) + value
+        for key, value in totals.items():
+            yield self.name, dict(key), value
+
+
+@contextmanager
+def timed(histogram: Histogram, **labels):
+    """Observe the duration of the block, and add it to the request's timings."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        histogram.observe(elapsed, **labels)
+        timings = request_timings.get()
+        if timings is not None:
+            name = "-".join(str(v) for v in labels.values()) or histogram.name
+            timings[name] = timings.get(name, 0.0) + elapsed
+
+
+def server_timing(timings: dict) -> str:
+    """Format stage durations (seconds) as a Server-Timing header value."""
+    return ", ".join(f"{name};dur={elapsed * 1000:.2f}" for name, elapsed in timings.items())
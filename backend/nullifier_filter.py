@@ -0,0 +1,57 @@
+import math
+import os
+import threading
+
+NULLIFIER_FILTER_CAPACITY = int(os.environ.get("NULLIFIER_FILTER_CAPACITY", "1000000"))
+NULLIFIER_FILTER_ERROR_RATE = float(os.environ.get("NULLIFIER_FILTER_ERROR_RATE", "0.001"))
+
+
+class NullifierFilter:
+    """Process-local Bloom filter over nullifier digests.
+
+    ``might_contain`` returning False means the digest was never added, so
+    the database lookup can be skipped; True only means "maybe" and callers
+    fall through to the indexed query. Sized for ``capacity`` digests at
+    ``error_rate`` false positives.
+    """
+
+    def __init__(self, capacity: int = NULLIFIER_FILTER_CAPACITY,
+                 error_rate: float = NULLIFIER_FILTER_ERROR_RATE):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.num_bits = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._lock = threading.Lock()
+
+    def _positions(self, digest: str):
+        # Digests are already sha256 output, so two 64-bit slices give the
+        # independent hashes for double hashing.
+        raw = bytes.fromhex(digest)
+        h1 = int.from_bytes(raw[:8], "big")
+        h2 = int.from_bytes(raw[8:16], "big") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, digest: str) -> None:
+        with self._lock:
+            for pos in self._positions(digest):
+                self._bits[pos >> 3] |= 1 << (pos & 7)
+            self.count += 1
+
+    def might_contain(self, digest: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(digest))
+
+    def false_positive_rate(self) -> float:
+        """Expected false-positive rate at the current fill."""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+    def stats(self) -> dict:
+        return {
+            "count": self.count,
+            "capacity": self.capacity,
+            "num_bits": self.num_bits,
+            "num_hashes": self.num_hashes,
+            "memory_bytes": len(self._bits),
+            "false_positive_rate": self.false_positive_rate(),
+        }
@@ -0,0 +1,96 @@
+from key_registry import normalize_point
+from mappings import COURSE_FIXED, GRADE_CODES, PROFESSOR_CODES, collegeMap, departmentMap, majorMap
+
+# bb proof files are a 4-byte big-endian field count followed by that many
+# 32-byte fields; the public inputs come first, the 440-field proof after.
+FIELD_SIZE = 32
+PROOF_FIELDS = 440
+COMMON_INPUTS = ["pk_x_hi", "pk_x_lo", "pk_y_hi", "pk_y_lo", "rootSchool",
+                 "professor", "college_idx", "dept_idx", "course_idx"]
+
+# Public inputs of each circuit in declaration order, by VK index.
+PUBLIC_INPUTS = {
+    0: COMMON_INPUTS,
+    1: ["major"] + COMMON_INPUTS,
+    2: ["grade"] + COMMON_INPUTS,
+    3: ["grade", "major"] + COMMON_INPUTS,
+}
+
+MAJOR_CODES = {college: {name.strip(): code for name, code in majors.items()}
+               for college, majors in majorMap.items()}
+
+
+def parse_public_inputs(proof_hex: str, vk_index: int) -> dict:
+    """Decode the public inputs of a hex-encoded proof for VK *vk_index*.
+
+    Only the header and public-input section are decoded. Raises ValueError if
+    the proof does not have the circuit's layout.
+    """
+    names = PUBLIC_INPUTS[vk_index]
+    try:
+        header = bytes.fromhex(proof_hex.strip()[:2 * (4 + FIELD_SIZE * len(names))])
+    except ValueError as e:
+        raise ValueError(f"Invalid hex data: {e}") from None
+    if len(header) < 4:
+        raise ValueError("Malformed proof: too short")
+    count = int.from_bytes(header[:4], "big")
+    if count != len(names) + PROOF_FIELDS:
+        raise ValueError(f"Malformed proof: {count} fields, expected {len(names) + PROOF_FIELDS}")
+    if len(proof_hex.strip()) != 2 * (4 + FIELD_SIZE * count):
+        raise ValueError("Malformed proof: length does not match field count")
+    return {
+        name: int.from_bytes(header[4 + FIELD_SIZE * i:4 + FIELD_SIZE * (i + 1)], "big")
+        for i, name in enumerate(names)
+    }
+
+
+def expected_public_inputs(arg_dict: dict, vk_index: int) -> dict:
+    """Public inputs a proof for this review must carry, except ``rootSchool``.
+
+    Raises ValueError if a review field has no circuit code.
+    """
+    college = arg_dict["college"]
+    department = arg_dict["department"]
+    # class_name is "<department> <course number>".
+    course = str(arg_dict["class_name"]).rpartition(" ")[2]
+    point = normalize_point(arg_dict["public_keyX"], arg_dict["public_keyY"])
+    lookups = {
+        "college_idx": lambda: collegeMap[college],
+        "dept_idx": lambda: departmentMap[college][department],
+        "course_idx": lambda: COURSE_FIXED[college][course],
+        "professor": lambda: PROFESSOR_CODES[arg_dict["professor_name"]],
+        "grade": lambda: GRADE_CODES[arg_dict["grade"]],
+        "major": lambda: MAJOR_CODES[college][str(arg_dict["major"]).strip()],
+    }
+
+    expected = {}
+    for name in PUBLIC_INPUTS[vk_index]:
+        if name in lookups:
+            try:
+                expected[name] = lookups[name]()
+            except (KeyError, TypeError):
+                raise ValueError(f"Public input mismatch: unknown {name.replace('_idx', '')}") from None
+    if point is None:
+        raise ValueError("Public input mismatch: malformed public key")
+    mask = (1 << 128) - 1
+    expected.update(pk_x_hi=point[0] >> 128, pk_x_lo=point[0] & mask,
+                    pk_y_hi=point[1] >> 128, pk_y_lo=point[1] & mask)
+    return expected
+
+
+def check_public_inputs(proof_hex: str, vk_index: int, arg_dict: dict, root_cache):
+    """Compare a proof's public inputs with the review and the accepted roots.
+
+    Returns ``(error, public_inputs)``; *error* is None if the proof can match.
+    """
+    try:
+        public_inputs = parse_public_inputs(proof_hex, vk_index)
+        expected = expected_public_inputs(arg_dict, vk_index)
+    except ValueError as e:
+        return str(e), None
+    for name, value in expected.items():
+        if public_inputs[name] != value:
+            return f"Public input mismatch: {name}", public_inputs
+    if not root_cache.accepts(public_inputs["rootSchool"]):
+        return "Unknown school root", public_inputs
+    return None, public_inputs
@@ -0,0 +1,84 @@
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", "256"))
+# Bound on the plain + gzip bytes held by the cache, per process.
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Larger responses (e.g. unfiltered full-table reads) are served but not kept.
+RESPONSE_CACHE_ENTRY_MAX_BYTES = int(os.environ.get("RESPONSE_CACHE_ENTRY_MAX_BYTES", str(1024 * 1024)))
+
+CachedResponse = namedtuple("CachedResponse", ["version", "body", "gzip_body", "headers"])
+
+
+def response_etag(shape: str, version: int, coding: str = "identity") -> str:
+    """ETag for a query shape at a write version; computable without building the body.
+
+    The gzip and identity bodies differ byte for byte, so each content coding
+    gets its own strong validator.
+    """
+    etag = f"v{version}-{hashlib.sha1(shape.encode()).hexdigest()[:16]}"
+    return etag if coding == "identity" else f"{etag}-{coding}"
+
+
+def entry_size(entry: CachedResponse) -> int:
+    return len(entry.body) + len(entry.gzip_body)
+
+
+class ResponseCache:
+    """LRU of encoded read responses keyed by query shape.
+
+    Bounded both by entry count and by total bytes; a response bigger than
+    ``entry_max_bytes`` is returned to the caller without being stored.
+
+    Each entry remembers the write version it was built at and is only
+    served while that version is current, so every committed review
+    invalidates all entries without any explicit purge.
+    """
+
+    def __init__(self, maxsize: int = RESPONSE_CACHE_SIZE, max_bytes: int = RESPONSE_CACHE_MAX_BYTES,
+                 entry_max_bytes: int = RESPONSE_CACHE_ENTRY_MAX_BYTES):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.entry_max_bytes = entry_max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, shape: str, version: int):
+        with self._lock:
+            entry = self._entries.get(shape)
+            if entry is not None and entry.version == version:
+                self._entries.move_to_end(shape)
+                self.hits += 1
+                return entry
+            self.misses += 1
+            return None
+
+    def put(self, shape: str, version: int, body: bytes, headers: dict) -> CachedResponse:
+        entry = CachedResponse(version, body, gzip.compress(body, compresslevel=6),
+                               headers)
+        size = entry_size(entry)
+        if size > min(self.entry_max_bytes, self.max_bytes):
+            return entry
+        with self._lock:
+            current = self._entries.get(shape)
+            # Never replace a newer entry built by a concurrent request.
+            if current is None or current.version <= version:
+                if current is not None:
+                    self.bytes -= entry_size(current)
+                self._entries[shape] = entry
+                self._entries.move_to_end(shape)
+                self.bytes += size
+            while len(self._entries) > self.maxsize or self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= entry_size(evicted)
+        return entry
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._entries), "bytes": self.bytes, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,98 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+
+# Accepted Merkle roots. SCHOOL_ROOTS is a comma-separated list of
+# "school=0xroot" (or bare "0xroot") entries; SCHOOL_ROOTS_FILE is a JSON
+# object mapping each school to a root or a list of roots.
+SCHOOL_ROOTS = os.environ.get("SCHOOL_ROOTS", "")
+SCHOOL_ROOTS_FILE = os.environ.get("SCHOOL_ROOTS_FILE", "")
+# Roots kept per school, so proofs made just before a new root is
+# published still pass.
+ROOTS_PER_SCHOOL = int(os.environ.get("ROOTS_PER_SCHOOL", "4"))
+
+
+def parse_root(value) -> int:
+    if isinstance(value, int):
+        return value
+    value = str(value).strip()
+    return int(value, 16) if value[:2] in ("0x", "0X") else int(value)
+
+
+class RootCache:
+    """In-memory set of the current Merkle roots of each school.
+
+    Reviews do not name their school, so a proof's ``rootSchool`` is accepted
+    if it is among the recent roots of any school. An empty cache accepts
+    every root, leaving the check to the verifier.
+    """
+
+    def __init__(self, per_school: int = ROOTS_PER_SCHOOL):
+        self.per_school = max(1, per_school)
+        self._schools = {}
+        self._roots = frozenset()
+        self._lock = threading.Lock()
+
+    def add(self, school: str, root) -> None:
+        """Record *root* as the newest root of *school*."""
+        root = parse_root(root)
+        with self._lock:
+            roots = self._schools.setdefault(school, OrderedDict())
+            roots.pop(root, None)
+            roots[root] = True
+            while len(roots) > self.per_school:
+                roots.popitem(last=False)
+            self._roots = frozenset(r for rs in self._schools.values() for r in rs)
+
+    def replace(self, school: str, roots) -> None:
+        """Set the roots of *school*, oldest first; an empty list forgets the school."""
+        recent = OrderedDict((parse_root(root), True) for root in roots)
+        while len(recent) > self.per_school:
+            recent.popitem(last=False)
+        with self._lock:
+            if recent:
+                self._schools[school] = recent
+            else:
+                self._schools.pop(school, None)
+            self._roots = frozenset(r for rs in self._schools.values() for r in rs)
+
+    def accepts(self, root: int) -> bool:
+        roots = self._roots
+        return not roots or root in roots
+
+    def roots(self) -> dict:
+        with self._lock:
+            return {school: [f"0x{r:064x}" for r in roots] for school, roots in self._schools.items()}
+
+    def __len__(self):
+        return len(self._roots)
+
+    def load_env(self, spec: str = SCHOOL_ROOTS, path: str = SCHOOL_ROOTS_FILE) -> None:
+        for entry in filter(None, (e.strip() for e in spec.split(","))):
+            school, _, root = entry.rpartition("=")
+            self.add(school or "default", root)
+        if path:
+            with open(path) as f:
+                for school, roots in json.load(f).items():
+                    for root in roots if isinstance(roots, list) else [roots]:
+                        self.add(school, root)
+
+
+_root_cache = None
+_root_cache_lock = threading.Lock()
+
+
+def get_root_cache() -> RootCache:
+    """Return the process-wide root cache, loaded from the environment on first use."""
+    global _root_cache
+    with _root_cache_lock:
+        if _root_cache is None:
+            _root_cache = RootCache()
+            _root_cache.load_env()
+            if os.environ.get("ROOT_RPC_URL") and os.environ.get("ROOT_REGISTRY_ADDRESS"):
+                # Roots indexed from the registry contract; synced in the background.
+                from root_indexer import start_indexer
+                start_indexer(_root_cache)
+            print(f"Root cache loaded: {len(_root_cache)} roots")
+    return _root_cache
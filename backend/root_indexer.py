@@ -0,0 +1,381 @@
+"""Local index of the roots published by SchoolRootRegistry.
+
+Syncs ``RootAdded`` events (contracts/school/school.sol) from a JSON-RPC
+endpoint into an SQLite table and keeps the latest root of every
+(school, semester) and the last ``ROOTS_PER_SCHOOL`` roots of every school in
+memory. Lookups and the backend's root cache are served from memory; the chain
+is only read by the background sync.
+
+    python root_indexer.py --rpc http://127.0.0.1:8545 --address 0x... --once
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+
+from root_cache import ROOTS_PER_SCHOOL
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+
+ROOT_RPC_URL = os.environ.get("ROOT_RPC_URL", "")
+ROOT_REGISTRY_ADDRESS = os.environ.get("ROOT_REGISTRY_ADDRESS", "")
+ROOT_INDEX_DB = os.environ.get("ROOT_INDEX_DB", os.path.join(basedir, "roots.sqlite"))
+ROOT_START_BLOCK = int(os.environ.get("ROOT_START_BLOCK", "0"))
+ROOT_CONFIRMATIONS = int(os.environ.get("ROOT_CONFIRMATIONS", "0"))
+# Already indexed blocks re-read on every sync; roots whose logs no longer
+# appear there (chain reorganisations) are deleted.
+ROOT_REORG_DEPTH = int(os.environ.get("ROOT_REORG_DEPTH", "64"))
+ROOT_SYNC_INTERVAL = float(os.environ.get("ROOT_SYNC_INTERVAL", "30"))
+ROOT_SYNC_BLOCKS = int(os.environ.get("ROOT_SYNC_BLOCKS", "2000"))
+ROOT_RPC_TIMEOUT = float(os.environ.get("ROOT_RPC_TIMEOUT", "10"))
+
+# Keccak-f[1600] round constants and rotation offsets.
+_RC = [
+    0x0000000000000001, 0x0000000000008082, 0x800000000000808A, 0x8000000080008000,
+    0x000000000000808B, 0x0000000080000001, 0x8000000080008081, 0x8000000000008009,
+    0x000000000000008A, 0x0000000000000088, 0x0000000080008009, 0x000000008000000A,
+    0x000000008000808B, 0x800000000000008B, 0x8000000000008089, 0x8000000000008003,
+    0x8000000000008002, 0x8000000000000080, 0x000000000000800A, 0x800000008000000A,
+    0x8000000080008081, 0x8000000000008080, 0x0000000080000001, 0x8000000080008008,
+]
+_ROT = [
+    [0, 36, 3, 41, 18], [1, 44, 10, 45, 2], [62, 6, 43, 15, 61],
+    [28, 55, 25, 21, 56], [27, 20, 39, 8, 14],
+]
+_MASK = (1 << 64) - 1
+
+
+def _keccak_f(state):
+    for rc in _RC:
+        c = [state[x][0] ^ state[x][1] ^ state[x][2] ^ state[x][3] ^ state[x][4] for x in range(5)]
+        d = [c[(x - 1) % 5] ^ (((c[(x + 1) % 5] << 1) | (c[(x + 1) % 5] >> 63)) & _MASK) for x in range(5)]
+        state = [[state[x][y] ^ d[x] for y in range(5)] for x in range(5)]
+        b = [[0] * 5 for _ in range(5)]
+        for x in range(5):
+            for y in range(5):
+                r = _ROT[x][y]
+                b[y][(2 * x + 3 * y) % 5] = ((state[x][y] << r) | (state[x][y] >> (64 - r))) & _MASK if r else state[x][y]
+        state = [[b[x][y] ^ (~b[(x + 1) % 5][y] & b[(x + 2) % 5][y]) for y in range(5)] for x in range(5)]
+        state[0][0] ^= rc
+    return state
+
+
+def keccak256(data: bytes) -> bytes:
+    """Ethereum's Keccak-256 (original padding, not hashlib's SHA3-256)."""
+    rate = 136
+    data = bytearray(data) + b"\x01" + b"\x00" * ((-len(data) - 1) % rate)
+    data[-1] |= 0x80
+    state = [[0] * 5 for _ in range(5)]
+    for offset in range(0, len(data), rate):
+        block = data[offset:offset + rate]
+        for i in range(rate // 8):
+            state[i % 5][i // 5] ^= int.from_bytes(block[8 * i:8 * i + 8], "little")
+        state = _keccak_f(state)
+    return b"".join(state[i % 5][i // 5].to_bytes(8, "little") for i in range(4))
+
+
+ROOT_ADDED_TOPIC = "0x" + keccak256(b"RootAdded(string,string,bytes32,uint256)").hex()
+ADD_ROOT_SELECTOR = keccak256(b"addRoot(string,string,bytes32)")[:4]
+
+
+def name_hash(name: str) -> str:
+    """Topic value of an indexed string argument."""
+    return "0x" + keccak256(name.encode()).hex()
+
+
+class JsonRpcTransport:
+    """Minimal JSON-RPC client over HTTP. Any ``(method, params) -> result`` callable can replace it."""
+
+    def __init__(self, url: str = ROOT_RPC_URL, timeout: float = ROOT_RPC_TIMEOUT):
+        self.url = url
+        self.timeout = timeout
+        self._id = 0
+
+    def __call__(self, method: str, params: list):
+        self._id += 1
+        body = json.dumps({"jsonrpc": "2.0", "id": self._id, "method": method, "params": params}).encode()
+        request = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            reply = json.load(response)
+        if reply.get("error"):
+            raise RuntimeError(f"RPC {method} failed: {reply['error']}")
+        return reply["result"]
+
+
+def decode_add_root(input_hex: str):
+    """Decode ``addRoot(school, semester, root)`` calldata, or return None."""
+    data = bytes.fromhex(input_hex[2:] if input_hex.startswith("0x") else input_hex)
+    if data[:4] != ADD_ROOT_SELECTOR:
+        return None
+    args = data[4:]
+
+    def word(offset):
+        if offset + 32 > len(args):
+            raise IndexError(offset)
+        return int.from_bytes(args[offset:offset + 32], "big")
+
+    def string(offset):
+        length = word(offset)
+        if offset + 32 + length > len(args):
+            raise IndexError(offset)
+        return args[offset + 32:offset + 32 + length].decode()
+
+    try:
+        return string(word(0)), string(word(32)), f"0x{word(64):064x}"
+    except (IndexError, UnicodeDecodeError):
+        return None
+
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS school_roots (
+        block_number INTEGER NOT NULL,
+        log_index INTEGER NOT NULL,
+        tx_hash TEXT,
+        school_hash TEXT NOT NULL,
+        semester_hash TEXT NOT NULL,
+        school TEXT,
+        semester TEXT,
+        root TEXT NOT NULL,
+        timestamp INTEGER NOT NULL,
+        PRIMARY KEY (block_number, log_index)
+    )""",
+    "CREATE TABLE IF NOT EXISTS root_indexer_state (key TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+]
+
+
+class RootIndexer:
+    """Syncs RootAdded events into SQLite and answers root lookups from memory.
+
+    Each school's recent roots are kept in *root_cache* (a
+    :class:`root_cache.RootCache`), under the school name when it can be
+    decoded from the ``addRoot`` calldata and under the school's topic hash
+    otherwise. Roots dropped by a reorganisation within the last
+    *reorg_depth* blocks are deleted from the table, memory and *root_cache*.
+    """
+
+    def __init__(self, transport, address: str = ROOT_REGISTRY_ADDRESS, db_path: str = ROOT_INDEX_DB,
+                 per_school: int = ROOTS_PER_SCHOOL, root_cache=None,
+                 start_block: int = ROOT_START_BLOCK, confirmations: int = ROOT_CONFIRMATIONS,
+                 reorg_depth: int = ROOT_REORG_DEPTH):
+        self.transport = transport
+        self.address = address.lower()
+        self.per_school = max(1, per_school)
+        self.root_cache = root_cache
+        self.start_block = start_block
+        self.confirmations = confirmations
+        self.reorg_depth = max(0, reorg_depth)
+        self._db = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        for statement in SCHEMA:
+            self._db.execute(statement)
+        self._db.commit()
+        self._latest = {}
+        self._recent = {}
+        # Root cache name of each school hash, and the table generation loaded.
+        self._school_names = {}
+        self._generation = None
+        self._lock = threading.Lock()
+        # The connection is shared by the sync thread and lookups.
+        self._db_lock = threading.Lock()
+        self._thread = None
+        self._load()
+
+    def _state(self, key: str, default: int) -> int:
+        row = self._db.execute("SELECT value FROM root_indexer_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_state(self, key: str, value: int) -> None:
+        self._db.execute(
+            "INSERT INTO root_indexer_state VALUES (?, ?)"
+            " ON CONFLICT(key) DO UPDATE SET value = excluded.value", (key, value),
+        )
+
+    def _load(self) -> None:
+        """Rebuild the in-memory roots from SQLite and replace them in the root cache.
+
+        Runs whenever the table's generation changed, including changes made
+        by other processes sharing the database.
+        """
+        with self._db_lock:
+            generation = self._state("generation", 0)
+            rows = self._db.execute(
+                "SELECT school_hash, semester_hash, school, root, timestamp FROM school_roots"
+                " ORDER BY block_number, log_index"
+            ).fetchall()
+        latest, recent, names = {}, {}, {}
+        for school_hash, semester_hash, school, root, timestamp in rows:
+            latest[(school_hash, semester_hash)] = (root, timestamp)
+            roots = recent.setdefault(school_hash, OrderedDict())
+            roots.pop(root, None)
+            roots[root] = timestamp
+            while len(roots) > self.per_school:
+                roots.popitem(last=False)
+            if school or school_hash not in names:
+                names[school_hash] = school or school_hash
+        with self._lock:
+            previous = self._school_names
+            self._latest, self._recent, self._school_names = latest, recent, names
+            self._generation = generation
+        if self.root_cache is not None:
+            for school_hash, name in previous.items():
+                if names.get(school_hash) != name:
+                    self.root_cache.replace(name, [])
+            for school_hash, name in names.items():
+                self.root_cache.replace(name, list(recent[school_hash]))
+
+    @property
+    def synced_block(self) -> int:
+        with self._db_lock:
+            return self._state("synced_block", self.start_block - 1)
+
+    def _names(self, tx_hash: str, school_hash: str, semester_hash: str):
+        """School and semester names from the transaction input, if it is a direct addRoot call."""
+        try:
+            tx = self.transport("eth_getTransactionByHash", [tx_hash])
+            decoded = decode_add_root(tx["input"]) if tx else None
+        except (RuntimeError, KeyError, ValueError):
+            decoded = None
+        if decoded and name_hash(decoded[0]) == school_hash and name_hash(decoded[1]) == semester_hash:
+            return decoded[0], decoded[1]
+        return None, None
+
+    def sync(self) -> int:
+        """Index events up to the latest confirmed block. Returns the number of new roots.
+
+        The last ``reorg_depth`` indexed blocks are read again, and indexed
+        roots whose log is gone, marked ``removed`` or changed are deleted.
+        """
+        head = int(self.transport("eth_blockNumber", []), 16) - self.confirmations
+        added = 0
+        start = max(self.start_block, self.synced_block + 1 - self.reorg_depth)
+        while start <= head:
+            end = min(head, start + ROOT_SYNC_BLOCKS - 1)
+            logs = self.transport("eth_getLogs", [{
+                "address": self.address,
+                "topics": [ROOT_ADDED_TOPIC],
+                "fromBlock": hex(start),
+                "toBlock": hex(end),
+            }])
+            fresh = {}
+            for log in logs:
+                if log.get("removed"):
+                    continue
+                data = log["data"][2:]
+                fresh[(int(log["blockNumber"], 16), int(log["logIndex"], 16))] = (
+                    log["transactionHash"], log["topics"][1], log["topics"][2], "0x" + data[:64], int(data[64:128], 16),
+                )
+            with self._db_lock:
+                indexed = {
+                    (row[0], row[1]): row[2:]
+                    for row in self._db.execute(
+                        "SELECT block_number, log_index, tx_hash, school_hash, semester_hash, root, timestamp"
+                        " FROM school_roots WHERE block_number BETWEEN ? AND ?", (start, end),
+                    )
+                }
+            new = {key: fields for key, fields in fresh.items() if indexed.get(key) != fields}
+            names = {key: self._names(*fields[:3]) for key, fields in new.items()}
+            changed = 0
+            with self._db_lock:
+                for key, fields in indexed.items():
+                    if fresh.get(key) != fields:
+                        changed += self._db.execute(
+                            "DELETE FROM school_roots WHERE block_number = ? AND log_index = ?", key,
+                        ).rowcount
+                for key, (tx_hash, school_hash, semester_hash, root, timestamp) in sorted(new.items()):
+                    school, semester = names[key]
+                    inserted = self._db.execute(
+                        "INSERT OR IGNORE INTO school_roots VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (*key, tx_hash, school_hash, semester_hash, school, semester, root, timestamp),
+                    ).rowcount
+                    added += inserted
+                    changed += inserted
+                if changed:
+                    self._set_state("generation", self._state("generation", 0) + 1)
+                # Re-read blocks never move the sync point back.
+                self._set_state("synced_block", max(end, self._state("synced_block", self.start_block - 1)))
+                self._db.commit()
+            start = end + 1
+        with self._db_lock:
+            generation = self._state("generation", 0)
+        if generation != self._generation:
+            self._load()
+        return added
+
+    def get_root_info(self, school: str, semester: str):
+        """``(root, timestamp)`` of the latest root for *school* and *semester*, or None."""
+        with self._lock:
+            return self._latest.get((name_hash(school), name_hash(semester)))
+
+    def get_root(self, school: str, semester: str):
+        """Like the contract's ``getRoot``, but None instead of zero when unset."""
+        info = self.get_root_info(school, semester)
+        return info[0] if info else None
+
+    def recent_roots(self, school: str) -> list:
+        """The last ``per_school`` roots published for *school*, oldest first."""
+        with self._lock:
+            return list(self._recent.get(name_hash(school), ()))
+
+    def history(self, school: str, semester: str = None) -> list:
+        """Every indexed root of *school* (optionally one semester), oldest first."""
+        query = "SELECT semester, root, timestamp, block_number FROM school_roots WHERE school_hash = ?"
+        params = [name_hash(school)]
+        if semester is not None:
+            query += " AND semester_hash = ?"
+            params.append(name_hash(semester))
+        with self._db_lock:
+            rows = self._db.execute(query + " ORDER BY block_number, log_index", params).fetchall()
+        return [dict(zip(["semester", "root", "timestamp", "block_number"], row)) for row in rows]
+
+    def start(self, interval: float = ROOT_SYNC_INTERVAL) -> None:
+        """Sync in a background thread every *interval* seconds."""
+        if self._thread is not None:
+            return
+
+        def run():
+            while True:
+                try:
+                    added = self.sync()
+                    if added:
+                        print(f"Root indexer: {added} new roots")
+                except Exception as e:
+                    print(f"Root indexer sync failed: {e}")
+                time.sleep(interval)
+
+        self._thread = threading.Thread(target=run, name="root-indexer", daemon=True)
+        self._thread.start()
+
+
+def start_indexer(root_cache) -> RootIndexer:
+    """Start syncing the configured registry into *root_cache* in the background."""
+    indexer = RootIndexer(JsonRpcTransport(), root_cache=root_cache)
+    indexer.start()
+    return indexer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index SchoolRootRegistry roots into SQLite.")
+    parser.add_argument("--rpc", default=ROOT_RPC_URL, help="JSON-RPC endpoint")
+    parser.add_argument("--address", default=ROOT_REGISTRY_ADDRESS, help="Registry contract address")
+    parser.add_argument("--db", default=ROOT_INDEX_DB)
+    parser.add_argument("--once", action="store_true", help="Sync once and exit")
+    parser.add_argument("--school", help="Print the recent roots of this school")
+    args = parser.parse_args()
+    if not args.rpc or not args.address:
+        parser.error("--rpc and --address (or ROOT_RPC_URL and ROOT_REGISTRY_ADDRESS) are required")
+
+    indexer = RootIndexer(JsonRpcTransport(args.rpc), args.address, args.db)
+    while True:
+        print(f"Indexed {indexer.sync()} new roots up to block {indexer.synced_block}")
+        if args.school:
+            print(json.dumps(indexer.recent_roots(args.school), indent=2))
+        if args.once:
+            return
+        time.sleep(ROOT_SYNC_INTERVAL)
+
+
+if __name__ == "__main__":
+    main()
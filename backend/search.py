@@ -0,0 +1,56 @@
+"""SQLite FTS5 index over review text, professor and class names.
+
+``review_fts`` is an external-content FTS5 table over ``review``: it stores
+only the index, and triggers keep it in sync with inserts, updates and
+deletes on the review table.
+"""
+import re
+
+FTS_SETUP = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS review_fts USING fts5(
+        text, professor_name, class_name,
+        content='review', content_rowid='id'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS review_fts_insert AFTER INSERT ON review BEGIN
+        INSERT INTO review_fts(rowid, text, professor_name, class_name)
+        VALUES (new.id, new.text, new.professor_name, new.class_name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS review_fts_delete AFTER DELETE ON review BEGIN
+        INSERT INTO review_fts(review_fts, rowid, text, professor_name, class_name)
+        VALUES ('delete', old.id, old.text, old.professor_name, old.class_name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS review_fts_update AFTER UPDATE ON review BEGIN
+        INSERT INTO review_fts(review_fts, rowid, text, professor_name, class_name)
+        VALUES ('delete', old.id, old.text, old.professor_name, old.class_name);
+        INSERT INTO review_fts(rowid, text, professor_name, class_name)
+        VALUES (new.id, new.text, new.professor_name, new.class_name);
+    END""",
+]
+
+
+def fts_exists(connection) -> bool:
+    return connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'review_fts'"
+    ).first() is not None
+
+
+def init_search(connection) -> bool:
+    """Create the FTS table and triggers. Returns True if the table was new."""
+    created = not fts_exists(connection)
+    for statement in FTS_SETUP:
+        connection.exec_driver_sql(statement)
+    return created
+
+
+def rebuild_search(connection) -> None:
+    """Rebuild the whole index from the review table."""
+    connection.exec_driver_sql("INSERT INTO review_fts(review_fts) VALUES ('rebuild')")
+
+
+def match_query(q: str) -> str:
+    """Turn free text into an FTS5 query that ANDs every word as a literal term.
+
+    Quoting each term keeps user input from being parsed as FTS5 syntax.
+    """
+    terms = re.findall(r"\w+", q)
+    return " ".join('"' + term + '"' for term in terms)
@@ -0,0 +1,107 @@
+"""Production entry point: serve the review backend with gunicorn.
+
+The schema is created and migrated once in the master process, then the app
+is preloaded and forked into ``--workers`` processes of ``--threads`` threads
+each. Every worker starts its own verifier pool, key registry, root cache and
+nullifier filter after the fork, so nothing that holds pipes or connections is
+shared between workers. Set ``METRICS_DIR`` so ``/metrics`` sums the counters
+and histograms of every worker.
+
+    python serve.py --workers 4 --threads 8
+
+gunicorn is an optional dependency (``pip install gunicorn``); the debug
+server (``python backend.py``) does not need it.
+"""
+import argparse
+import os
+
+from backend import create_app, db, get_nullifier_filter, init_db
+from key_registry import get_registry
+from metrics import METRICS_DIR, REGISTRY, clear_metrics_dir, start_publisher
+from root_cache import get_root_cache
+from verify_proof import close_pool, get_pool
+
+SERVE_BIND = os.environ.get("SERVE_BIND", "127.0.0.1:5001")
+SERVE_WORKERS = int(os.environ.get("SERVE_WORKERS", str(os.cpu_count() or 1)))
+SERVE_THREADS = int(os.environ.get("SERVE_THREADS", "4"))
+SERVE_KEEPALIVE = int(os.environ.get("SERVE_KEEPALIVE", "5"))
+SERVE_TIMEOUT = int(os.environ.get("SERVE_TIMEOUT", "120"))
+SERVE_LIMIT_REQUEST_LINE = int(os.environ.get("SERVE_LIMIT_REQUEST_LINE", "8190"))
+SERVE_LIMIT_REQUEST_FIELD_SIZE = int(os.environ.get("SERVE_LIMIT_REQUEST_FIELD_SIZE", "8190"))
+
+
+def post_fork(server, worker):
+    """Per-worker setup: fresh DB connections, verifier pool, key registry, root cache, nullifier filter, submission workers and metrics publisher."""
+    app = worker.app.wsgi()
+    with app.app_context():
+        # Connections opened by init_db() in the master must not be reused.
+        db.engine.dispose(close=False)
+        # Warm the Bloom filter before the first request instead of inside it.
+        get_nullifier_filter()
+    get_pool()
+    get_registry()
+    get_root_cache()
+    # Also sweeps for tickets left pending by workers that died.
+    app.extensions["submission_queue"].start()
+    start_publisher()
+    server.log.info(f"Worker {worker.pid} ready")
+
+
+def worker_exit(server, worker):
+    if METRICS_DIR:
+        # The exited worker's last totals keep counting in /metrics.
+        REGISTRY.publish()
+    close_pool()
+
+
+def gunicorn_options(args) -> dict:
+    return {
+        "bind": args.bind,
+        "workers": args.workers,
+        "threads": args.threads,
+        "worker_class": "gthread" if args.threads > 1 else "sync",
+        "keepalive": args.keepalive,
+        "timeout": args.timeout,
+        "limit_request_line": args.limit_request_line,
+        "limit_request_field_size": args.limit_request_field_size,
+        "preload_app": True,
+        "post_fork": post_fork,
+        "worker_exit": worker_exit,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the review backend with gunicorn.")
+    parser.add_argument("--bind", default=SERVE_BIND)
+    parser.add_argument("--workers", type=int, default=SERVE_WORKERS)
+    parser.add_argument("--threads", type=int, default=SERVE_THREADS)
+    parser.add_argument("--keepalive", type=int, default=SERVE_KEEPALIVE, help="Keep-alive seconds")
+    parser.add_argument("--timeout", type=int, default=SERVE_TIMEOUT, help="Worker timeout in seconds")
+    parser.add_argument("--limit-request-line", type=int, default=SERVE_LIMIT_REQUEST_LINE)
+    parser.add_argument("--limit-request-field-size", type=int, default=SERVE_LIMIT_REQUEST_FIELD_SIZE)
+    args = parser.parse_args()
+
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        raise SystemExit("gunicorn is not installed; run `pip install gunicorn`")
+
+    if METRICS_DIR:
+        clear_metrics_dir()
+    app = create_app()
+    with app.app_context():
+        init_db()
+
+    class ReviewApplication(BaseApplication):
+        def load_config(self):
+            for key, value in gunicorn_options(args).items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app
+
+    ReviewApplication().run()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,21 +3,27 @@ from cryptography.hazmat.primitives.asymmetric import ec, utils
 from cryptography.exceptions import InvalidSignature
 
 
-def check_signature(signature, pkX, pkY, message):
-    x_bytes = bytes.fromhex(pkX) if not pkX[:2] == "0x" else bytes.fromhex(pkX[2:])
-    y_bytes = bytes.fromhex(pkY) if not pkY[:2] == "0x" else bytes.fromhex(pkY[2:])
+def check_signature(signature, pkX, pkY, message, public_key=None):
+    """Verify *signature* over *message*.
 
-    encoded_point = b"\x04" + x_bytes + y_bytes 
+    *public_key* may be a key object already resolved by the key registry;
+    otherwise it is decoded from the hex coordinates *pkX*/*pkY*.
+    """
+    if public_key is None:
+        x_bytes = bytes.fromhex(pkX) if not pkX[:2] == "0x" else bytes.fromhex(pkX[2:])
+        y_bytes = bytes.fromhex(pkY) if not pkY[:2] == "0x" else bytes.fromhex(pkY[2:])
 
+        encoded_point = b"\x04" + x_bytes + y_bytes 
 
-    try:
-        public_key = ec.EllipticCurvePublicKey.from_encoded_point(
-        ec.SECP256R1(),
-        encoded_point
-    )
-    except Exception as e:
-        print(f"Serialization error: {e}")
-        return False
+
+        try:
+            public_key = ec.EllipticCurvePublicKey.from_encoded_point(
+            ec.SECP256R1(),
+            encoded_point
+        )
+        except Exception as e:
+            print(f"Serialization error: {e}")
+            return False
 
     try:
         public_key.verify(
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""Local stand-in for the ``bb`` binary.
+
+Understands ``verify`` and mimics bb's output so the backend can be exercised
+without Barretenberg installed, e.g. ``BB_BINARY="python3 stub_bb.py"``.
+
+Environment:
+    STUB_BB_DELAY   seconds to sleep per call (default 0)
+    STUB_BB_RESULT  "pass" or "fail" (default "pass")
+"""
+import os
+import sys
+import time
+
+
+def main():
+    args = sys.argv[1:]
+    if not args or args[0] != "verify":
+        print(f"stub_bb: unsupported command {args[:1]}", file=sys.stderr)
+        return 1
+    if "-k" not in args or "-p" not in args:
+        print("stub_bb: missing -k/-p", file=sys.stderr)
+        return 1
+
+    vk_path = args[args.index("-k") + 1]
+    proof_path = args[args.index("-p") + 1]
+    with open(vk_path, "rb") as f:
+        f.read()
+    with open(proof_path, "rb") as f:
+        f.read()
+
+    time.sleep(float(os.environ.get("STUB_BB_DELAY", "0")))
+
+    print("Scheme is: ultra_honk, num threads: 1")
+    if os.environ.get("STUB_BB_RESULT", "pass") == "pass":
+        print("Proof verified successfully")
+        return 0
+    print("Proof verification failed")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
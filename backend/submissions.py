@@ -0,0 +1,81 @@
+import os
+import queue
+import threading
+import time
+
+SUBMISSION_WORKERS = int(os.environ.get("SUBMISSION_WORKERS", "2"))
+SUBMISSION_QUEUE_SIZE = int(os.environ.get("SUBMISSION_QUEUE_SIZE", "256"))
+# Seconds a claimed ticket may stay pending before another process retries it.
+SUBMISSION_LEASE = float(os.environ.get("SUBMISSION_LEASE", "300"))
+# Seconds between sweeps for abandoned tickets and expired results.
+SUBMISSION_SWEEP_INTERVAL = float(os.environ.get("SUBMISSION_SWEEP_INTERVAL", "30"))
+# Seconds finished tickets stay available for status lookups.
+SUBMISSION_RETAIN = float(os.environ.get("SUBMISSION_RETAIN", "86400"))
+
+
+class SubmissionQueue:
+    """Bounded queue of review submissions processed by background threads.
+
+    Ticket state lives in the database, so any process can answer a status
+    lookup; this queue only runs the jobs accepted by its own process.
+    ``handler(ticket, arg_dict)`` processes one job and records its outcome.
+    ``recover()``, if given, is called every ``sweep_interval`` seconds and
+    returns ``(ticket, arg_dict)`` pairs abandoned by other (e.g. restarted)
+    processes, which are queued again here.
+    """
+
+    def __init__(self, handler, recover=None, workers: int = SUBMISSION_WORKERS,
+                 maxsize: int = SUBMISSION_QUEUE_SIZE, sweep_interval: float = SUBMISSION_SWEEP_INTERVAL):
+        self.handler = handler
+        self.recover = recover
+        self.workers = max(1, workers)
+        self.sweep_interval = sweep_interval
+        self._jobs = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self) -> None:
+        """Start the worker threads and the sweeper; a no-op once running.
+
+        Call this after forking: threads do not survive ``fork()``.
+        """
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"submission-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            if self.recover is not None:
+                thread = threading.Thread(target=self._sweep, name="submission-sweeper", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, ticket: str, arg_dict: dict) -> bool:
+        """Queue a job for *ticket*; False if the queue is full."""
+        self.start()
+        try:
+            self._jobs.put_nowait((ticket, arg_dict))
+        except queue.Full:
+            return False
+        return True
+
+    def _run(self) -> None:
+        while True:
+            ticket, arg_dict = self._jobs.get()
+            try:
+                self.handler(ticket, arg_dict)
+            except Exception as e:
+                # The ticket stays pending and is retried once its lease expires.
+                print(f"Submission {ticket} failed: {e}")
+            self._jobs.task_done()
+
+    def _sweep(self) -> None:
+        while True:
+            try:
+                for ticket, arg_dict in self.recover():
+                    if not self.submit(ticket, arg_dict):
+                        break
+            except Exception as e:
+                print(f"Submission sweep failed: {e}")
+            time.sleep(self.sweep_interval)
@@ -0,0 +1,70 @@
+import os
+import sys
+
+import pytest
+
+# The backend modules are imported as top-level scripts.
+basedir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, basedir)
+
+
+@pytest.fixture
+def review_app(tmp_path, monkeypatch):
+    """The review app on a scratch SQLite database, with two enrolled keys and stub_bb.py.
+
+    Yields ``(app, make_review)``; ``make_review(key, course)`` returns a
+    correctly signed review of course number *course* by enrolled key *key*.
+    """
+    import random
+
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.asymmetric import ec
+
+    import backend
+    import benchmark
+    import key_registry
+    import response_cache
+    import root_cache
+    import verify_proof
+
+    keys = benchmark.generate_keys(2)
+    keys_file = str(tmp_path / "parsed_keys.json")
+    benchmark.write_parsed_keys(keys, keys_file)
+    monkeypatch.setattr(key_registry, "_registry", key_registry.KeyRegistry(keys_file))
+    monkeypatch.setattr(root_cache, "_root_cache", root_cache.RootCache())
+    monkeypatch.setattr(verify_proof, "BB_BINARY", f"{sys.executable} {os.path.join(basedir, 'stub_bb.py')}")
+    monkeypatch.setattr(verify_proof, "VERIFIER_BACKEND", "cli")
+    monkeypatch.setattr(verify_proof, "_pool", None)
+    monkeypatch.setattr(backend, "_nullifier_filter", None)
+    monkeypatch.setattr(backend, "response_cache", response_cache.ResponseCache())
+    monkeypatch.setenv("STUB_BB_RESULT", "pass")
+
+    app = backend.create_app("sqlite:///" + str(tmp_path / "reviews.sqlite"))
+    with app.app_context():
+        backend.init_db()
+    courses = benchmark.load_courses()
+    rng = random.Random(0)
+
+    def make_review(key: int, course: int) -> dict:
+        college, department, number = courses[course]
+        text = f"review {key}/{course}"
+        numbers = keys[key].public_key().public_numbers()
+        payload = {
+            "text": text,
+            "rating": "4",
+            "recommend": "true",
+            "grade": "NOT_USED",
+            "major": "NOT_USED",
+            "professor_name": benchmark.PROFESSORS[0],
+            "class_name": f"{department} {number}",
+            "college": college,
+            "department": department,
+            "signature": keys[key].sign(text.encode(), ec.ECDSA(hashes.SHA256())).hex(),
+            "public_keyX": hex(numbers.x),
+            "public_keyY": hex(numbers.y),
+        }
+        payload["proof"] = benchmark.random_proof(payload, rng)
+        return payload
+
+    yield app, make_review
+    verify_proof.close_pool()
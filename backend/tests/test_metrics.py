@@ -0,0 +1,44 @@
+"""With METRICS_DIR set, /metrics sums counters and histograms over processes."""
+import multiprocessing
+import os
+
+import metrics
+
+
+def test_values_summed_across_processes(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_DIR", str(tmp_path))
+    monkeypatch.setattr(metrics, "_store", None)
+    registry = metrics.Registry()
+    submissions = metrics.Counter("submissions_total", "Submissions.", ["result"], registry=registry)
+    seconds = metrics.Histogram("stage_seconds", "Stages.", ["stage"], buckets=(0.1, 1), registry=registry)
+    jobs = {"jobs": 0}
+    metrics.CounterFunc("jobs_total", "Jobs.", lambda: jobs["jobs"], registry=registry)
+    metrics.Gauge("workers", "Workers.", lambda: 2, registry=registry)
+    metrics.Gauge("rows", "Rows.", lambda: 7, registry=registry, per_process=False)
+
+    def work(n):
+        for _ in range(n):
+            submissions.inc(result="accepted")
+            seconds.observe(0.5, stage="verify")
+        jobs["jobs"] = n
+        registry.publish()
+
+    context = multiprocessing.get_context("fork")
+    children = [context.Process(target=work, args=(n,)) for n in (2, 3)]
+    for child in children:
+        child.start()
+    for child in children:
+        child.join()
+        assert child.exitcode == 0
+    work(1)
+
+    lines = registry.render().splitlines()
+    assert 'submissions_total{result="accepted"} 6.0' in lines
+    assert 'stage_seconds_bucket{stage="verify",le="0.1"} 0' in lines
+    assert 'stage_seconds_bucket{stage="verify",le="1"} 6' in lines
+    assert 'stage_seconds_count{stage="verify"} 6' in lines
+    assert 'stage_seconds_sum{stage="verify"} 3.0' in lines
+    # Exited processes keep their counter totals but drop out of per-process gauges.
+    assert "jobs_total 6.0" in lines
+    assert [line for line in lines if line.startswith("workers")] == [f'workers{{pid="{os.getpid()}"}} 2.0']
+    assert "rows 7" in lines
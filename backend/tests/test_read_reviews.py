@@ -0,0 +1,27 @@
+"""Buffered and streamed /read_reviews group reviews the same way."""
+import backend
+
+
+def test_null_groups_match(review_app):
+    app, _ = review_app
+    rows = [
+        dict(college="A", department="CS", text="a"),
+        dict(college=None, department="CS", text="b"),
+        dict(college="", department=None, text="c"),
+        dict(college="A", department=None, text="d"),
+        dict(college=None, department=None, text="e"),
+    ]
+    with app.app_context():
+        backend.db.session.execute(backend.db.insert(backend.Review), rows)
+        backend.bump_write_version()
+        backend.db.session.commit()
+
+    client = app.test_client()
+    buffered = client.get("/read_reviews")
+    streamed = client.get("/read_reviews?stream=1")
+    assert buffered.status_code == streamed.status_code == 200
+    assert streamed.get_json() == buffered.get_json()
+    grouped = buffered.get_json()
+    assert [r["text"] for r in grouped[""][""]] == ["c", "e"]
+    assert [r["text"] for r in grouped[""]["CS"]] == ["b"]
+    assert [r["text"] for r in grouped["A"][""]] == ["d"]
@@ -0,0 +1,27 @@
+"""ETags of cached reads follow the write version and the content coding."""
+import backend
+
+
+def test_etag_per_coding_and_write(review_app):
+    app, make_review = review_app
+    client = app.test_client()
+    plain = client.get("/read_reviews")
+    gzipped = client.get("/read_reviews", headers={"Accept-Encoding": "gzip"})
+    assert gzipped.headers["Content-Encoding"] == "gzip"
+    assert plain.get_etag()[1] is False and gzipped.get_etag()[1] is False
+    assert plain.get_etag()[0] != gzipped.get_etag()[0]
+
+    # A validator only matches the coding it was issued for.
+    gzip_etag = gzipped.headers["ETag"]
+    assert client.get("/read_reviews", headers={"Accept-Encoding": "gzip",
+                                                "If-None-Match": gzip_etag}).status_code == 304
+    assert client.get("/read_reviews", headers={"If-None-Match": gzip_etag}).status_code == 200
+
+    # Every committed review bumps the version, so old validators stop matching.
+    assert client.post("/write_review", json=make_review(0, 0)).status_code == 201
+    assert client.post("/write_reviews_batch", json=[make_review(0, 1), make_review(1, 0)]).status_code == 200
+    with app.app_context():
+        assert backend.write_version() == 3
+    response = client.get("/read_reviews", headers={"If-None-Match": plain.headers["ETag"]})
+    assert response.status_code == 200
+    assert sum(len(r) for d in response.get_json().values() for r in d.values()) == 3
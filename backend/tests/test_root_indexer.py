@@ -0,0 +1,229 @@
+"""root_indexer against recorded JSON-RPC replies of a SchoolRootRegistry.
+
+``fixtures/root_registry.json`` holds the ``eth_getLogs`` and
+``eth_getTransactionByHash`` replies for eight ``RootAdded`` events up to
+block 44; ``fixtures/root_registry_reorg.json`` is the same registry after
+blocks 33 onwards were reorganised.
+"""
+import hashlib
+import json
+import os
+
+import pytest
+
+import root_indexer
+from root_cache import RootCache
+from root_indexer import RootIndexer, decode_add_root, keccak256, name_hash
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+ADDRESS = "0x5FbDB2315678afecb367f032d93F642f64180aa3"
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name)) as f:
+        return json.load(f)
+
+
+class FakeChain:
+    """JSON-RPC transport answering from a fixture, filtering logs like a node."""
+
+    def __init__(self, fixture):
+        self.fixture = fixture
+        self.calls = []
+
+    def __call__(self, method, params):
+        self.calls.append(method)
+        if method == "eth_blockNumber":
+            return self.fixture["eth_blockNumber"]
+        if method == "eth_getLogs":
+            query = params[0]
+            start, end = int(query["fromBlock"], 16), int(query["toBlock"], 16)
+            return [dict(log) for log in self.fixture["eth_getLogs"]
+                    if log["address"] == query["address"] and log["topics"][0] == query["topics"][0]
+                    and start <= int(log["blockNumber"], 16) <= end]
+        if method == "eth_getTransactionByHash":
+            return self.fixture["eth_getTransactionByHash"].get(params[0])
+        raise RuntimeError(f"RPC {method} failed: unsupported")
+
+
+def fixture_root(fixture, block, log_index=0):
+    for log in fixture["eth_getLogs"]:
+        if (int(log["blockNumber"], 16), int(log["logIndex"], 16)) == (block, log_index) and not log["removed"]:
+            return "0x" + log["data"][2:66]
+    raise KeyError((block, log_index))
+
+
+@pytest.fixture
+def chain():
+    return FakeChain(load_fixture("root_registry.json"))
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "roots.sqlite")
+
+
+def sponge(data: bytes, pad: int) -> bytes:
+    """Keccak[512] sponge over root_indexer's permutation, with the given domain padding."""
+    rate = 136
+    data = bytearray(data) + bytes([pad]) + b"\x00" * ((-len(data) - 1) % rate)
+    data[-1] |= 0x80
+    state = [[0] * 5 for _ in range(5)]
+    for offset in range(0, len(data), rate):
+        for i in range(rate // 8):
+            state[i % 5][i // 5] ^= int.from_bytes(data[offset + 8 * i:offset + 8 * i + 8], "little")
+        state = root_indexer._keccak_f(state)
+    return b"".join(state[i % 5][i // 5].to_bytes(8, "little") for i in range(4))
+
+
+@pytest.mark.parametrize("data, digest", [
+    (b"", "c5d2460186f7233c927e7db2dcc703c0e500b653ca82273b7bfad8045d85a470"),
+    (b"abc", "4e03657aea45a94fc7d47ba826c8d667c0d1e6e33a64a036ec44f58fa12d6c45"),
+    (b"The quick brown fox jumps over the lazy dog",
+     "4d741b6f1eb29cb2a9b9911c82f56fa8d73b04959d3d9d222895df6c0b28aa15"),
+    (b"Transfer(address,address,uint256)", "ddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"),
+])
+def test_keccak256_known_answers(data, digest):
+    assert keccak256(data).hex() == digest
+
+
+def test_keccak256_function_selector():
+    assert keccak256(b"transfer(address,uint256)")[:4].hex() == "a9059cbb"
+
+
+@pytest.mark.parametrize("length", [0, 1, 135, 136, 137, 271, 272, 273, 1000])
+def test_keccak_permutation_matches_sha3_across_blocks(length):
+    data = bytes(range(256)) * 4
+    assert sponge(data[:length], 0x06) == hashlib.sha3_256(data[:length]).digest()
+    assert sponge(data[:length], 0x01) == keccak256(data[:length])
+
+
+def test_decode_add_root():
+    root = "0x" + "ab" * 32
+    calldata = (
+        "0x" + root_indexer.ADD_ROOT_SELECTOR.hex()
+        + f"{0x60:064x}" + f"{0xa0:064x}" + root[2:]
+        + f"{3:064x}" + b"CAS".hex().ljust(64, "0")
+        + f"{8:064x}" + b"Fall2025".hex().ljust(64, "0")
+    )
+    assert decode_add_root(calldata) == ("CAS", "Fall2025", root)
+    assert decode_add_root(calldata[2:]) == ("CAS", "Fall2025", root)
+
+
+def test_decode_add_root_fixture_transactions(chain):
+    fixture = chain.fixture
+    log = fixture["eth_getLogs"][0]
+    tx = fixture["eth_getTransactionByHash"][log["transactionHash"]]
+    school, semester, root = decode_add_root(tx["input"])
+    assert (name_hash(school), name_hash(semester)) == (log["topics"][1], log["topics"][2])
+    assert root == "0x" + log["data"][2:66]
+
+
+@pytest.mark.parametrize("calldata", [
+    "0x6a761202" + "00" * 64,  # another function
+    "0x" + root_indexer.ADD_ROOT_SELECTOR.hex() + f"{0x60:064x}" + f"{0x1000:064x}",  # truncated
+    "0x" + root_indexer.ADD_ROOT_SELECTOR.hex() + f"{0x60:064x}" + f"{0xa0:064x}" + "00" * 32
+    + f"{2:064x}" + "ffff".ljust(64, "0") + f"{1:064x}" + "41".ljust(64, "0"),  # invalid UTF-8
+])
+def test_decode_add_root_rejects(calldata):
+    assert decode_add_root(calldata) is None
+
+
+def test_sync(chain, db_path):
+    indexer = RootIndexer(chain, ADDRESS, db_path)
+    assert indexer.sync() == 8
+    assert indexer.synced_block == 44
+    fixture = chain.fixture
+    assert indexer.get_root("CAS", "Fall2024") == fixture_root(fixture, 16)
+    # Re-published in the same block: the later log wins.
+    assert indexer.get_root("CAS", "Spring2025") == fixture_root(fixture, 21, 1)
+    assert indexer.get_root_info("ENG", "Fall2024") == (fixture_root(fixture, 18), 1735689624)
+    assert indexer.get_root("ENG", "Spring2025") is None
+    assert [h["semester"] for h in indexer.history("CAS")] == [
+        "Fall2024", "Spring2025", "Spring2025", "Fall2025", "Spring2026", "Fall2026"]
+    # Published through a multisig: indexed, but the names are unknown.
+    assert [h["semester"] for h in indexer.history("QST")] == [None]
+    assert indexer.get_root("QST", "Fall2025") == fixture_root(fixture, 30)
+    assert indexer.sync() == 0
+
+
+def test_sync_in_batches_and_confirmations(chain, db_path, monkeypatch):
+    monkeypatch.setattr(root_indexer, "ROOT_SYNC_BLOCKS", 5)
+    indexer = RootIndexer(chain, ADDRESS, db_path, confirmations=6)
+    assert indexer.sync() == 7
+    assert indexer.synced_block == 38
+    assert indexer.get_root("CAS", "Fall2026") is None
+    assert chain.calls.count("eth_getLogs") == 8
+    assert indexer.sync() == 0
+
+
+def test_recent_window(chain, db_path):
+    indexer = RootIndexer(chain, ADDRESS, db_path, per_school=4)
+    indexer.sync()
+    fixture = chain.fixture
+    expected = [fixture_root(fixture, 21, 1), fixture_root(fixture, 25), fixture_root(fixture, 33),
+                fixture_root(fixture, 40)]
+    assert indexer.recent_roots("CAS") == expected
+    assert indexer.recent_roots("ENG") == [fixture_root(fixture, 18)]
+    assert indexer.recent_roots("MIT") == []
+    # Reloaded from SQLite by a fresh indexer.
+    assert RootIndexer(chain, ADDRESS, db_path, per_school=4).recent_roots("CAS") == expected
+
+
+def test_feeds_root_cache(chain, db_path):
+    cache = RootCache(per_school=4)
+    RootIndexer(chain, ADDRESS, db_path, per_school=4, root_cache=cache).sync()
+    fixture = chain.fixture
+    roots = cache.roots()
+    assert set(roots) == {"CAS", "ENG", name_hash("QST")}
+    assert roots["CAS"] == [f"0x{int(fixture_root(fixture, b, i), 16):064x}"
+                            for b, i in [(21, 1), (25, 0), (33, 0), (40, 0)]]
+    assert cache.accepts(int(fixture_root(fixture, 40), 16))
+    assert cache.accepts(int(fixture_root(fixture, 30), 16))
+    # Pushed out of the CAS window.
+    assert not cache.accepts(int(fixture_root(fixture, 16), 16))
+
+    restarted = RootCache(per_school=4)
+    RootIndexer(chain, ADDRESS, db_path, per_school=4, root_cache=restarted)
+    assert restarted.roots() == roots
+
+
+def test_reorg_drops_orphaned_roots(chain, db_path):
+    cache = RootCache(per_school=4)
+    indexer = RootIndexer(chain, ADDRESS, db_path, root_cache=cache)
+    indexer.sync()
+    before = chain.fixture
+    orphaned = fixture_root(before, 40)
+
+    chain.fixture = load_fixture("root_registry_reorg.json")
+    after = chain.fixture
+    assert indexer.sync() == 2
+    assert indexer.synced_block == 46
+    assert indexer.get_root("CAS", "Fall2026") is None
+    assert indexer.get_root("CAS", "Spring2026") == fixture_root(after, 35, 2)
+    assert indexer.get_root("ENG", "Spring2025") == fixture_root(after, 45)
+    assert [h["block_number"] for h in indexer.history("CAS")] == [16, 21, 21, 25, 35]
+    assert indexer.recent_roots("CAS")[-1] == fixture_root(after, 35, 2)
+    assert orphaned not in indexer.recent_roots("CAS")
+    assert not cache.accepts(int(orphaned, 16))
+    assert not cache.accepts(int(fixture_root(before, 33), 16))
+    # Pushed out before the reorg, back in the window once Fall2026 is gone.
+    assert cache.accepts(int(fixture_root(before, 21, 0), 16))
+
+
+def test_reorg_seen_by_other_processes(chain, db_path):
+    cache = RootCache()
+    first = RootIndexer(chain, ADDRESS, db_path)
+    first.sync()
+    second = RootIndexer(FakeChain(chain.fixture), ADDRESS, db_path, root_cache=cache)
+    orphaned = int(fixture_root(chain.fixture, 40), 16)
+    assert cache.accepts(orphaned)
+
+    reorg = load_fixture("root_registry_reorg.json")
+    first.transport = FakeChain(reorg)
+    first.sync()
+    # The rows are already gone; the second indexer catches up from the table.
+    second.transport = FakeChain(reorg)
+    assert second.sync() == 0
+    assert second.get_root("CAS", "Fall2026") is None
+    assert not cache.accepts(orphaned)
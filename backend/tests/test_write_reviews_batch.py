@@ -0,0 +1,40 @@
+"""/write_reviews_batch answers every item on its own."""
+
+
+def test_malformed_items_fail_alone(review_app):
+    app, make_review = review_app
+    client = app.test_client()
+    reviews = [
+        make_review(0, 0),
+        dict(make_review(0, 1), college=1),
+        dict(make_review(0, 2), public_keyX=None),
+        make_review(1, 0),
+        "not a review",
+        dict(make_review(1, 1), department=["CS"]),
+    ]
+    response = client.post("/write_reviews_batch", json={"reviews": reviews})
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert [r["status"] for r in results] == [201, 400, 400, 201, 400, 400]
+    assert results[1]["error"] == "Invalid field type: college"
+    assert results[2]["error"] == "Invalid field type: public_keyX"
+    assert results[5]["error"] == "Invalid field type: department"
+
+    # The accepted reviews were stored, the rejected ones were not.
+    reviews_read = client.get("/read_reviews").get_json()
+    assert sum(len(r) for d in reviews_read.values() for r in d.values()) == 2
+
+
+def test_duplicate_in_batch(review_app):
+    app, make_review = review_app
+    review = make_review(0, 0)
+    results = app.test_client().post("/write_reviews_batch", json=[review, review]).get_json()["results"]
+    assert [r["status"] for r in results] == [201, 500]
+    assert results[1]["error"] == "Review already submitted - nullifier triggered"
+
+
+def test_single_write_rejects_bad_types(review_app):
+    app, make_review = review_app
+    response = app.test_client().post("/write_review", json=dict(make_review(0, 0), class_name=7))
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Invalid field type: class_name"}
@@ -0,0 +1,145 @@
+import atexit
+import os
+import queue
+import struct
+import subprocess
+import sys
+import threading
+import time
+
+from verify_proof import (BB_BINARY, BBJS_MODULES, NODE_BINARY, VERIFIER_BACKEND,
+                          VERIFIER_TIMEOUT, basedir, vk_paths)
+
+WORKER_SCRIPTS = {
+    "bbjs": os.path.join(basedir, "verifier_worker.js"),
+    "cli": os.path.join(basedir, "verifier_worker.py"),
+}
+
+# Both workers speak the framing pedersen_hasher.js uses: a request is a
+# 1-byte VK index and a 4-byte big-endian length, then the proof; a reply is
+# one byte (1 verified, 0 failed, 2 error followed by a length-prefixed message).
+REQUEST_HEADER = struct.Struct(">BI")
+VERIFIED, FAILED, ERROR = 1, 0, 2
+
+
+def worker_command(backend: str, bb: str = BB_BINARY, timeout: float = VERIFIER_TIMEOUT) -> list:
+    """Command line that starts one *backend* ("bbjs" or "cli") verifier worker."""
+    if backend == "bbjs":
+        vks = [os.path.join(basedir, vk_paths[i]) for i in sorted(vk_paths)]
+        return [NODE_BINARY, WORKER_SCRIPTS["bbjs"]] + vks
+    if backend == "cli":
+        return [sys.executable, WORKER_SCRIPTS["cli"], "--bb", bb, "--timeout", str(timeout)]
+    raise ValueError(f"Unknown verifier backend: {backend}")
+
+
+def read_reply(stream):
+    """Read one worker reply as ``(status, error message)``, or None if the worker died."""
+    status = stream.read(1)
+    if not status:
+        return None
+    if status[0] != ERROR:
+        return status[0], ""
+    size = stream.read(4)
+    if len(size) < 4:
+        return None
+    length = struct.unpack(">I", size)[0]
+    message = stream.read(length)
+    if len(message) < length:
+        return None
+    return ERROR, message.decode(errors="replace")
+
+
+class VerifierPool:
+    """Fixed-size pool of pre-started verifier worker processes.
+
+    With the "bbjs" backend each worker is a ``verifier_worker.js`` process
+    that holds the VKs in bb.js and verifies in memory; "cli" workers are
+    ``verifier_worker.py`` processes that run the bb command per proof.
+    Each call to :meth:`verify` checks out an idle worker, sends it the proof
+    over its stdin pipe and reads the verdict back from its stdout pipe, so
+    callers on different threads never touch the same files.
+    """
+
+    def __init__(self, size: int, bb: str = BB_BINARY, timeout: float = VERIFIER_TIMEOUT,
+                 backend: str = VERIFIER_BACKEND):
+        self.size = max(1, size)
+        self.bb = bb
+        self.timeout = timeout
+        self.backend = backend
+        self.command = worker_command(backend, bb, timeout)
+        self._idle = queue.Queue()
+        self._workers = []
+        # Guards _workers: _replace runs on request threads, close() at exit.
+        self._workers_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.jobs = 0
+        self.busy_seconds = 0.0
+        self.last_seconds = 0.0
+        for _ in range(self.size):
+            self._idle.put(self._spawn())
+        atexit.register(self.close)
+
+    def _spawn(self) -> subprocess.Popen:
+        env = dict(os.environ)
+        if self.backend == "bbjs":
+            env["NODE_PATH"] = os.pathsep.join(filter(None, [BBJS_MODULES, env.get("NODE_PATH")]))
+        worker = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            cwd=basedir,
+            env=env,
+        )
+        with self._workers_lock:
+            self._workers.append(worker)
+        return worker
+
+    def _replace(self, worker: subprocess.Popen) -> None:
+        worker.kill()
+        worker.wait()
+        with self._workers_lock:
+            if worker not in self._workers:
+                return  # closed meanwhile
+            self._workers.remove(worker)
+        self._idle.put(self._spawn())
+
+    def verify(self, data: bytes, vk_index: int) -> bool:
+        """Verify raw proof bytes against VK *vk_index* on an idle worker."""
+        worker = self._idle.get()
+        start = time.perf_counter()
+        try:
+            worker.stdin.write(REQUEST_HEADER.pack(vk_index, len(data)) + data)
+            worker.stdin.flush()
+            reply = read_reply(worker.stdout)
+        except (BrokenPipeError, OSError):
+            reply = None
+        elapsed = time.perf_counter() - start
+        with self._stats_lock:
+            self.jobs += 1
+            self.busy_seconds += elapsed
+            self.last_seconds = elapsed
+
+        if reply is None:
+            self._replace(worker)
+            raise RuntimeError("Verifier worker exited unexpectedly")
+        self._idle.put(worker)
+
+        status, message = reply
+        if status == ERROR:
+            # Timeouts, unknown VKs and the like are not verdicts on the proof.
+            raise RuntimeError(f"Verifier error: {message}")
+        return status == VERIFIED
+
+    def stats(self) -> dict:
+        """Worker counts and time spent waiting on worker replies."""
+        with self._stats_lock:
+            return {"size": self.size, "idle": self._idle.qsize(), "jobs": self.jobs,
+                    "busy_seconds": self.busy_seconds, "last_seconds": self.last_seconds}
+
+    def close(self) -> None:
+        with self._workers_lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            if worker.poll() is None:
+                worker.stdin.close()
+                worker.wait()
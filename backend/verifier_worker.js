@@ -0,0 +1,80 @@
+// verifier_worker.js
+// Resident UltraHonk (keccak) verifier for verifier_pool.py over stdin/stdout.
+//
+// Loads the VKs named on the command line (VK index = argument position) and
+// the bn254 CRS once, then verifies every proof in memory with bb.js, so no
+// bb process is started and no VK is read per proof.
+//
+// Request:  1-byte VK index, 4-byte big-endian proof length, then the proof
+//           as written by `bb prove` (4-byte field count, then the fields).
+// Response: 1 byte: 1 if the proof verified, 0 if it did not; 2 on an error,
+//           followed by a 4-byte big-endian length and a UTF-8 message.
+//
+//   NODE_PATH=../zero_knowledge/tree_creation/node_modules node verifier_worker.js VKs/vk_...
+//
+// BB_CRS_PATH overrides the CRS directory (default ~/.bb-crs, shared with bb).
+
+const fs = require("fs");
+const { BarretenbergSync, Crs, RawBuffer } = require("@aztec/bb.js");
+
+const FIELD_SIZE = 32;
+const HEADER_SIZE = 5;
+
+const vks = process.argv.slice(2).map((path) => new RawBuffer(fs.readFileSync(path)));
+
+async function instance(crs) {
+  const bb = await BarretenbergSync.new();
+  bb.srsInitSrs(new RawBuffer(crs.getG1Data()), crs.numPoints, new RawBuffer(crs.getG2Data()));
+  return bb;
+}
+
+function failure(message) {
+  const text = Buffer.from(message);
+  const out = Buffer.alloc(5 + text.length);
+  out[0] = 2;
+  out.writeUInt32BE(text.length, 1);
+  text.copy(out, 5);
+  return out;
+}
+
+(async () => {
+  // Verification only needs the first G1 point and the G2 point.
+  const crs = await Crs.new(1, process.env.BB_CRS_PATH || undefined);
+  let bb = await instance(crs);
+
+  async function verify(index, proof) {
+    if (index >= vks.length) return failure(`Unknown VK index: ${index}`);
+    if (proof.length < 4 || proof.length !== 4 + FIELD_SIZE * proof.readUInt32BE(0)) {
+      return failure("Malformed proof");
+    }
+    try {
+      // bb.js takes the bare fields, as UltraHonkBackend.verifyProof passes them.
+      const fields = new Uint8Array(proof.subarray(4));
+      return Buffer.from([bb.acirVerifyUltraKeccakHonk(fields, vks[index]) ? 1 : 0]);
+    } catch (e) {
+      // A trap leaves the wasm instance unusable; start a fresh one.
+      bb = await instance(crs);
+      return failure(`bb.js: ${e.message || e}`);
+    }
+  }
+
+  let pending = Buffer.alloc(0);
+  let queue = Promise.resolve();
+  async function drain() {
+    while (pending.length >= HEADER_SIZE) {
+      const size = HEADER_SIZE + pending.readUInt32BE(1);
+      if (pending.length < size) break;
+      const index = pending[0];
+      const proof = Buffer.from(pending.subarray(HEADER_SIZE, size));
+      pending = pending.subarray(size);
+      process.stdout.write(await verify(index, proof));
+    }
+  }
+  process.stdin.on("data", (chunk) => {
+    pending = Buffer.concat([pending, chunk]);
+    queue = queue.then(drain);
+  });
+})().catch((e) => {
+  console.error(`verifier_worker.js: ${e.message || e}`);
+  process.exit(1);
+});
@@ -0,0 +1,83 @@
+"""Long-lived bb CLI verifier worker, the fallback for verifier_worker.js.
+
+Speaks the same stdin/stdout framing as verifier_worker.js (see
+verifier_pool.py) but runs the bb command for every proof. Each worker
+copies the VKs into its own scratch directory at startup and writes proofs
+there, so concurrent workers never share a proof or output file.
+"""
+import argparse
+import os
+import struct
+import subprocess
+import sys
+import tempfile
+
+from verify_proof import BB_BINARY, VERIFIER_TIMEOUT, basedir, output_verdict, verify_command, vk_paths
+
+
+def load_vks(scratch_dir: str) -> dict:
+    """Copy every VK into *scratch_dir* once and return index -> local path."""
+    local_paths = {}
+    for vk_index, vk_path in vk_paths.items():
+        with open(os.path.join(basedir, vk_path), "rb") as f:
+            data = f.read()
+        local_path = os.path.join(scratch_dir, os.path.basename(vk_path))
+        with open(local_path, "wb") as f:
+            f.write(data)
+        local_paths[vk_index] = local_path
+    return local_paths
+
+
+def run_job(vk_index: int, proof: bytes, vks: dict, proof_path: str, bb: str, timeout: float) -> bool:
+    if vk_index not in vks:
+        raise ValueError(f"Unknown VK index: {vk_index}")
+    with open(proof_path, "wb") as f:
+        f.write(proof)
+
+    result = subprocess.run(
+        verify_command(vks[vk_index], proof_path, bb),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        timeout=timeout,
+    )
+    output = result.stdout.decode(errors="replace")
+    verdict = output_verdict(output)
+    # Crashes, kills and unexpected output are errors, not verdicts, so they
+    # are never cached as an invalid proof.
+    if result.returncode < 0:
+        raise RuntimeError(f"bb killed by signal {-result.returncode}")
+    if verdict is None or verdict != (result.returncode == 0):
+        last = output.strip().splitlines()[-1:] or ["no output"]
+        raise RuntimeError(f"bb exited with status {result.returncode} without a verdict: {last[0]}")
+    return verdict
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve bb verify requests over stdin/stdout.")
+    parser.add_argument("--bb", default=BB_BINARY, help="Verifier command.")
+    parser.add_argument("--timeout", type=float, default=VERIFIER_TIMEOUT,
+                        help="Per-proof timeout in seconds.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="verifier-") as scratch_dir:
+        vks = load_vks(scratch_dir)
+        proof_path = os.path.join(scratch_dir, "proof")
+
+        stdin, stdout = sys.stdin.buffer, sys.stdout.buffer
+        while True:
+            header = stdin.read(5)
+            if len(header) < 5:
+                break
+            vk_index, size = struct.unpack(">BI", header)
+            proof = stdin.read(size)
+            try:
+                reply = bytes([run_job(vk_index, proof, vks, proof_path, args.bb, args.timeout)])
+            except Exception as e:
+                message = f"{type(e).__name__}: {e}".encode()
+                reply = struct.pack(">BI", 2, len(message)) + message
+            stdout.write(reply)
+            stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+VERIFY_CACHE_SIZE = int(os.environ.get("VERIFY_CACHE_SIZE", "4096"))
+VERIFY_CACHE_TTL = float(os.environ.get("VERIFY_CACHE_TTL", "86400"))
+# Optional SQLite file for a persistent second tier; unset keeps the cache in memory only.
+VERIFY_CACHE_DB = os.environ.get("VERIFY_CACHE_DB")
+
+
+def cache_key(data: bytes, vk_index: int, public_inputs=()) -> str:
+    """Digest of the proof bytes, VK index and public inputs."""
+    h = hashlib.sha256()
+    h.update(str(vk_index).encode())
+    h.update(b"\0")
+    for value in public_inputs:
+        h.update(str(value).encode())
+        h.update(b"\0")
+    h.update(data)
+    return h.hexdigest()
+
+
+class VerificationCache:
+    """Bounded LRU/TTL cache of proof verification verdicts.
+
+    Entries live in an in-process ``OrderedDict`` and, if ``db_path`` is set,
+    in a SQLite table that survives restarts and is consulted on memory misses.
+    """
+
+    def __init__(self, maxsize: int = VERIFY_CACHE_SIZE, ttl: float = VERIFY_CACHE_TTL,
+                 db_path: str = VERIFY_CACHE_DB):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS verify_cache "
+                "(key TEXT PRIMARY KEY, ok INTEGER NOT NULL, created REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def get(self, key: str):
+        """Return the cached verdict for *key*, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[1] <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT ok, created FROM verify_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and now - row[1] <= self.ttl:
+                    self._store(key, bool(row[0]), row[1])
+                    self.hits += 1
+                    return bool(row[0])
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, ok: bool) -> None:
+        now = time.time()
+        with self._lock:
+            self._store(key, ok, now)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO verify_cache (key, ok, created) VALUES (?, ?, ?)",
+                    (key, int(ok), now),
+                )
+                self._db.execute("DELETE FROM verify_cache WHERE created < ?", (now - self.ttl,))
+                self._db.commit()
+
+    def _store(self, key: str, ok: bool, created: float) -> None:
+        self._entries[key] = (ok, created)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -1,21 +1,36 @@
-import subprocess
 import os
+import shlex
+import shutil
+import threading
 
+from verify_cache import VerificationCache, cache_key
 
-def write_proof_binary(hex_str: str, path: str = "./proof") -> None:
-    """Convert a hex string to raw bytes and write it to *path*."""
+basedir = os.path.abspath(os.path.dirname(__file__))
+
+# Command used to invoke Barretenberg. Can be overridden (e.g. with
+# "python3 stub_bb.py") to run against a local stand-in verifier.
+BB_BINARY = os.environ.get("BB_BINARY", "bb")
+VERIFIER_WORKERS = int(os.environ.get("VERIFIER_WORKERS", "2"))
+VERIFIER_TIMEOUT = float(os.environ.get("VERIFIER_TIMEOUT", "60"))
+# "bbjs" verifies in resident verifier_worker.js processes through
+# @aztec/bb.js; "cli" runs the bb command per proof in verifier_worker.py.
+# An explicit BB_BINARY selects the CLI unless VERIFIER_BACKEND says otherwise.
+VERIFIER_BACKEND = os.environ.get("VERIFIER_BACKEND", "cli" if "BB_BINARY" in os.environ else "bbjs")
+NODE_BINARY = os.environ.get("NODE_BINARY", "node")
+# bb.js is installed with the tree_creation scripts.
+BBJS_MODULES = os.environ.get(
+    "BBJS_MODULES",
+    os.path.join(basedir, "..", "zero_knowledge", "tree_creation", "node_modules"))
+
+
+def proof_bytes(hex_str: str) -> bytes:
+    """Decode a proof hex string, raising ValueError on malformed input."""
     hex_str = hex_str.strip().lower() # .replace("0x", "")
     try:
-        data = bytes.fromhex(hex_str)
+        return bytes.fromhex(hex_str)
     except ValueError as e:
         raise ValueError(f"Invalid hex data: {e}") from None
 
-    if os.path.exists(path):
-        os.remove(path)
-
-    with open(path, "wb") as f:
-        f.write(data)
-
 vk_paths = {
     0: "VKs/vk_no_grade_no_major",
     1: "VKs/vk_no_grade_yes_major",
@@ -24,11 +39,9 @@ vk_paths = {
 }
 
 
-def verify(path: str = "./proof", vk_path: str = "./vk",
-           out_path: str = "./verify_output.txt") -> None:
-    """Run the bb verifier and pipe stdout+stderr to *out_path*."""
-    cmd = [
-        "bb",
+def verify_command(vk_path: str, path: str, bb: str = BB_BINARY) -> list:
+    """Build the bb verify command line for *vk_path* and *path*."""
+    return shlex.split(bb) + [
         "verify",
         "--scheme", "ultra_honk",
         "--oracle_hash", "keccak",
@@ -36,21 +49,77 @@ def verify(path: str = "./proof", vk_path: str = "./vk",
         "-p", path,
     ]
 
-    with open(out_path, "w") as out:
-        subprocess.run(cmd, stdout=out, stderr=subprocess.STDOUT, check=True)
-
 
-def proof_verified(out_path: str = "verify_output.txt") -> bool:
-    try:
-        with open(out_path, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-        os.remove(out_path)
-        return len(lines) >= 2 and lines[1].strip() == "Proof verified successfully"
-    except FileNotFoundError:
+def output_verdict(output: str):
+    """bb's verdict from its combined output: True, False, or None if it reports neither."""
+    lines = [line.strip() for line in output.splitlines()]
+    if len(lines) >= 2 and lines[1] == "Proof verified successfully":
+        return True
+    if "Proof verification failed" in lines:
         return False
+    return None
+
+
+def bbjs_available() -> bool:
+    """Whether node and @aztec/bb.js are installed for verifier_worker.js."""
+    return (shutil.which(NODE_BINARY) is not None
+            and os.path.isdir(os.path.join(BBJS_MODULES, "@aztec", "bb.js")))
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the process-wide verifier pool, starting it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            from verifier_pool import VerifierPool
+            backend = VERIFIER_BACKEND
+            if backend == "bbjs" and not bbjs_available():
+                print(f"{NODE_BINARY} or @aztec/bb.js not found in {BBJS_MODULES}; "
+                      f"verifying with {BB_BINARY!r} instead")
+                backend = "cli"
+            _pool = VerifierPool(VERIFIER_WORKERS, bb=BB_BINARY,
+                                 timeout=VERIFIER_TIMEOUT, backend=backend)
+    return _pool
+
+
+def close_pool() -> None:
+    """Stop the verifier pool if it was started; a later get_pool() starts a new one."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
+
+
+def pool_stats() -> dict:
+    """Stats of the verifier pool, or an empty dict if it has not started."""
+    return _pool.stats() if _pool is not None else {}
+
+
+_cache = None
+
+
+def get_cache():
+    """Return the process-wide verification result cache."""
+    global _cache
+    with _pool_lock:
+        if _cache is None:
+            _cache = VerificationCache()
+    return _cache
+
 
+def verify_proof(proof_hex, vk_index, public_inputs=()):
+    data = proof_bytes(proof_hex)
+    key = cache_key(data, vk_index, public_inputs)
+    cache = get_cache()
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
 
-def verify_proof(proof_hex, vk_index):
-    write_proof_binary(proof_hex)
-    verify(vk_path=vk_paths[vk_index])
-    return proof_verified()
\ No newline at end of file
+    result = get_pool().verify(data, vk_index)
+    cache.put(key, result)
+    return result
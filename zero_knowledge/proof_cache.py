@@ -0,0 +1,197 @@
+"""Content-addressed store of generated proofs.
+
+An entry's key is a sha256 over the circuit's compiled ``program.json``, the
+nargo and bb commands with their reported versions, and the canonicalized
+inputs, so a proof is only reused for the exact artifact, toolchain and
+witness it was made from. Entries live in two-level shard directories
+(``ab/cd/<key>``), start with a sha256 of the proof that is checked on every
+read, and are evicted least-recently-used first once the store grows past
+``PROOF_CACHE_MAX_BYTES``. Writes are atomic, so a crashed batch leaves only
+complete entries behind.
+"""
+import hashlib
+import json
+import os
+import shlex
+import subprocess
+import tempfile
+import threading
+from collections import OrderedDict
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+
+PROOF_CACHE_DIR = os.environ.get("PROOF_CACHE_DIR", os.path.join(basedir, ".proof_cache"))
+# Size bound of the store; 0 disables the cache.
+PROOF_CACHE_MAX_BYTES = int(os.environ.get("PROOF_CACHE_MAX_BYTES", str(1024 ** 3)))
+
+DIGEST_SIZE = 32
+
+
+def canonical_value(value):
+    """Normalize a circuit input so "0x0a", "10" and 10 hash the same."""
+    if isinstance(value, (list, tuple)):
+        return [canonical_value(v) for v in value]
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, int):
+        return hex(value)
+    text = str(value).strip()
+    try:
+        return hex(int(text, 16) if text[:2] in ("0x", "0X") else int(text))
+    except ValueError:
+        return text
+
+
+_artifact_digests = {}
+
+
+def artifact_digest(path: str) -> str:
+    """sha256 of a compiled circuit, memoized per file modification time."""
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    if key not in _artifact_digests:
+        with open(path, "rb") as f:
+            _artifact_digests[key] = hashlib.sha256(f.read()).hexdigest()
+    return _artifact_digests[key]
+
+
+_toolchains = {}
+
+
+def toolchain_id(nargo: str, bb: str):
+    """The nargo and bb commands with their ``--version`` output, memoized.
+
+    None if either command does not report a version, in which case its
+    proofs are not cached.
+    """
+    if (nargo, bb) not in _toolchains:
+        versions = []
+        for command in (nargo, bb):
+            try:
+                result = subprocess.run(shlex.split(command) + ["--version"], capture_output=True,
+                                        text=True, timeout=30)
+            except (OSError, subprocess.TimeoutExpired):
+                result = None
+            if result is None or result.returncode != 0 or not result.stdout.strip():
+                versions = None
+                break
+            versions.append(f"{command}\0{result.stdout.strip()}")
+        _toolchains[(nargo, bb)] = "\0".join(versions) if versions else None
+    return _toolchains[(nargo, bb)]
+
+
+def proof_key(program_path: str, inputs: dict, toolchain: str) -> str:
+    canonical = json.dumps({k: canonical_value(v) for k, v in inputs.items()},
+                           sort_keys=True, separators=(",", ":"))
+    material = "\0".join([artifact_digest(program_path), toolchain, canonical])
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+class ProofCache:
+    """Sharded on-disk proof store with an integrity check and LRU eviction.
+
+    Entry sizes are tracked in memory, in least-recently-used order, from one
+    directory scan on first use plus this process's reads and writes; entries
+    other processes write are picked up when read. Eviction never rescans.
+    """
+
+    def __init__(self, root: str = PROOF_CACHE_DIR, max_bytes: int = PROOF_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = None
+        # path -> entry size, least recently used first; None until scanned.
+        self._index = None
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def _entries(self):
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if len(name) == 64:
+                    path = os.path.join(dirpath, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    yield stat.st_mtime_ns, stat.st_size, path
+
+    def _load_index(self) -> None:
+        if self._index is None:
+            self._index = OrderedDict((path, size) for _, size, path in sorted(self._entries()))
+            self._size = sum(self._index.values())
+
+    def _track(self, path: str, size) -> None:
+        """Record *path* as most recently used with *size* bytes, or forget it if *size* is None."""
+        with self._lock:
+            self._load_index()
+            self._size -= self._index.pop(path, 0)
+            if size is not None:
+                self._index[path] = size
+                self._size += size
+
+    def get(self, key: str):
+        """Return the stored proof for *key*, or None if absent or corrupt."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            self.misses += 1
+            if self._index is not None:
+                self._track(path, None)
+            return None
+        proof = data[DIGEST_SIZE:]
+        if hashlib.sha256(proof).digest() != data[:DIGEST_SIZE]:
+            print(f"Discarding corrupt proof cache entry {key}")
+            self._remove(path)
+            self._track(path, None)
+            self.misses += 1
+            return None
+        # Other processes order their own indexes by mtime; atime is often disabled.
+        os.utime(path)
+        self._track(path, len(data))
+        self.hits += 1
+        return proof
+
+    def put(self, key: str, proof: bytes) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        with os.fdopen(fd, "wb") as f:
+            f.write(hashlib.sha256(proof).digest() + proof)
+        os.replace(tmp, path)
+        # An overwritten entry replaces its old size rather than adding to it.
+        self._track(path, DIGEST_SIZE + len(proof))
+        with self._lock:
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _remove(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _evict(self) -> None:
+        while self._size > self.max_bytes and self._index:
+            path, size = self._index.popitem(last=False)
+            self._remove(path)
+            self._size -= size
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size_bytes": self._size}
+
+
+_cache = None
+
+
+def get_cache():
+    """Return the process-wide proof cache, or None if it is disabled."""
+    global _cache
+    if _cache is None and PROOF_CACHE_MAX_BYTES > 0:
+        _cache = ProofCache()
+    return _cache
@@ -0,0 +1,255 @@
+"""Proof generation for the four review circuits.
+
+Picks the circuit from the grade/major disclosure flags and proves each job in
+its own scratch directory: the circuit's ``Nargo.toml`` and ``src`` are
+symlinked in and the compiled ``target/program.json`` is copied, so jobs never
+share ``Prover.toml``, the witness or ``out/proof`` and can run in parallel on
+a process pool.
+
+    python prover.py --include_grade --leaf_index 2048 --path ... --rootSchool 0x...
+    python prover.py --jobs jobs.json --workers 8 --output proofs.jsonl
+
+``NARGO_BINARY`` and ``BB_BINARY`` select the toolchain; ``stub_prover.py``
+stands in for both when nargo and bb are not installed.
+"""
+import argparse
+import json
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from proof_cache import get_cache, proof_key, toolchain_id
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+CIRCUITS_DIR = os.path.join(basedir, "circuits")
+
+NARGO_BINARY = os.environ.get("NARGO_BINARY", "nargo")
+BB_BINARY = os.environ.get("BB_BINARY", "bb")
+PROVER_WORKERS = int(os.environ.get("PROVER_WORKERS", str(os.cpu_count() or 1)))
+# Parent directory of the per-job scratch directories (default: system temp).
+PROVER_SCRATCH_DIR = os.environ.get("PROVER_SCRATCH_DIR") or None
+
+# (include_grade, include_major) -> circuit directory
+CIRCUITS = {
+    (False, False): "verifyNoGradeNoMajor",
+    (False, True): "verifyNoGradeYesMajor",
+    (True, False): "verifyYesGradeNoMajor",
+    (True, True): "verifyYesGradeYesMajor",
+}
+
+FIELD_SIZE = 32
+
+ProofResult = namedtuple("ProofResult", ["circuit", "proof", "public_inputs"])
+
+
+def circuit_for(include_grade: bool, include_major: bool) -> str:
+    return CIRCUITS[(bool(include_grade), bool(include_major))]
+
+
+def package_name(circuit_dir: str) -> str:
+    """The package name from Nargo.toml, which names the witness and artifact files."""
+    with open(os.path.join(circuit_dir, "Nargo.toml")) as f:
+        for line in f:
+            key, _, value = line.partition("=")
+            if key.strip() == "name":
+                return value.strip().strip('"')
+    raise ValueError(f"No package name in {circuit_dir}/Nargo.toml")
+
+
+def public_input_names(program_path: str) -> list:
+    """Names of the circuit's public parameters, in declaration order."""
+    with open(program_path) as f:
+        abi = json.load(f)["abi"]
+    return [p["name"] for p in abi["parameters"] if p["visibility"] == "public"]
+
+
+def write_toml(inputs, path):
+    with open(path, "w") as f:
+        for key, value in inputs.items():
+            if isinstance(value, list):
+                # Write TOML array
+                arr = ", ".join(f"\"{v}\"" for v in value)
+                f.write(f"{key} = [{arr}]\n")
+            else:
+                # Write as a quoted string
+                f.write(f"{key} = \"{value}\"\n")
+
+
+def split_proof(data: bytes, names: list) -> dict:
+    """Public inputs at the front of a bb proof file, by name."""
+    return {
+        name: "0x" + data[4 + FIELD_SIZE * i:4 + FIELD_SIZE * (i + 1)].hex()
+        for i, name in enumerate(names)
+    }
+
+
+def prove(circuit: str, inputs: dict, nargo: str = NARGO_BINARY, bb: str = BB_BINARY,
+          scratch_root: str = PROVER_SCRATCH_DIR, use_cache: bool = True) -> ProofResult:
+    """Generate a proof for *circuit* from *inputs* in a private scratch directory.
+
+    Proofs already in the proof cache for the same compiled circuit, toolchain
+    and inputs are returned without running the toolchain. A toolchain that
+    does not report its version is never cached.
+    """
+    circuit_dir = os.path.join(CIRCUITS_DIR, circuit)
+    program_path = os.path.join(circuit_dir, "target", "program.json")
+    cache = get_cache() if use_cache else None
+    toolchain = toolchain_id(nargo, bb) if cache is not None else None
+    if toolchain is None:
+        cache = None
+    if cache is not None:
+        key = proof_key(program_path, inputs, toolchain)
+        proof = cache.get(key)
+        if proof is not None:
+            return ProofResult(circuit, proof, split_proof(proof, public_input_names(program_path)))
+
+    name = package_name(circuit_dir)
+    scratch = tempfile.mkdtemp(prefix=f"{circuit}-", dir=scratch_root)
+    try:
+        for entry in ["Nargo.toml", "src"]:
+            os.symlink(os.path.join(circuit_dir, entry), os.path.join(scratch, entry))
+        target_dir = os.path.join(scratch, "target")
+        os.makedirs(target_dir)
+        # Copied rather than linked: nargo may rewrite the artifact.
+        for artifact in ["program.json", f"{name}.json"]:
+            shutil.copy(program_path, os.path.join(target_dir, artifact))
+
+        write_toml(inputs, os.path.join(scratch, "Prover.toml"))
+        subprocess.run(shlex.split(nargo) + ["execute"], cwd=scratch, check=True,
+                       stdout=subprocess.DEVNULL)
+
+        acir_path = os.path.join(target_dir, "program.json")
+        out_dir = os.path.join(scratch, "out")
+        os.makedirs(out_dir)
+        subprocess.run(shlex.split(bb) + [
+            "prove",
+            "--scheme", "ultra_honk",
+            "--oracle_hash", "keccak",
+            "-b", acir_path,
+            "-w", os.path.join(target_dir, f"{name}.gz"),
+            "-o", out_dir,
+        ], cwd=scratch, check=True, stdout=subprocess.DEVNULL)
+
+        with open(os.path.join(out_dir, "proof"), "rb") as f:
+            proof = f.read()
+        if cache is not None:
+            cache.put(key, proof)
+        return ProofResult(circuit, proof, split_proof(proof, public_input_names(acir_path)))
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def _prove_job(job: dict) -> ProofResult:
+    circuit = job.get("circuit") or circuit_for(job.get("include_grade"), job.get("include_major"))
+    return prove(circuit, job["inputs"], use_cache=job.get("use_cache", True))
+
+
+class Prover:
+    """Process pool that proves jobs in parallel.
+
+    A job is a dict with ``inputs`` (the circuit's Prover.toml values) and
+    either ``circuit`` or the ``include_grade``/``include_major`` flags.
+    """
+
+    def __init__(self, workers: int = PROVER_WORKERS):
+        self.workers = max(1, workers)
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def submit(self, job: dict):
+        """Queue *job* and return a Future of its :class:`ProofResult`."""
+        return self._executor.submit(_prove_job, job)
+
+    def prove_many(self, jobs) -> list:
+        """Prove every job, returning results in the same order."""
+        return list(self._executor.map(_prove_job, jobs))
+
+    def close(self) -> None:
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Parse the input parameters required by the program."
+    )
+
+    # Simple scalar (string/integer) arguments
+    parser.add_argument("--leaf_index", required=True,
+                        help="Index of the Merkle-tree leaf.")
+    parser.add_argument("--pk_x_hi", required=True,
+                        help="Public-key X coordinate higher 128 bits (hex).")
+    parser.add_argument("--pk_x_lo", required=True,
+                        help="Public-key X coordinate lower 128 bits (hex).")
+    parser.add_argument("--pk_y_hi", required=True,
+                        help="Public-key Y coordinate higher 128 bits (hex).")
+    parser.add_argument("--pk_y_lo", required=True,
+                        help="Public-key Y coordinate lower 128 bits (hex).")
+    parser.add_argument("--professor", required=True, type=int,
+                        help="Professor identifier.")
+    parser.add_argument("--grade", required=True, type=int,
+                        help="Grade value.")
+    parser.add_argument("--major", required=True, type=int,
+                        help="Major identifier.")
+    parser.add_argument("--college_idx", required=True, type=int,
+                        help="College index.")
+    parser.add_argument("--dept_idx", required=True, type=int,
+                        help="Department index.")
+    parser.add_argument("--course_idx", required=True, type=int,
+                        help="Course index.")
+    parser.add_argument("--rootSchool", required=True,
+                        help="Root of the Merkle tree.")
+
+    # The Merkle proof path: variable-length positional list after --path
+    parser.add_argument(
+        "--path",
+        nargs="+",                # one or more values
+        required=True,
+        metavar="HASH",
+        help="Sequence of sibling hashes (hex strings) forming a Merkle proof."
+    )
+
+    return parser
+
+
+def main():
+    if "--jobs" in sys.argv:
+        parser = argparse.ArgumentParser(description="Prove a batch of jobs in parallel.")
+        parser.add_argument("--jobs", required=True, help="JSON file with a list of jobs")
+        parser.add_argument("--workers", type=int, default=PROVER_WORKERS)
+        parser.add_argument("--output", default="-", help="JSON lines output (default: stdout)")
+        parser.add_argument("--no-cache", action="store_true", help="Bypass the proof cache")
+        args = parser.parse_args()
+        with open(args.jobs) as f:
+            jobs = [dict(job, use_cache=not args.no_cache) for job in json.load(f)]
+        out = sys.stdout if args.output == "-" else open(args.output, "w")
+        with Prover(args.workers) as prover:
+            for i, result in enumerate(prover.prove_many(jobs)):
+                out.write(json.dumps({"index": i, "circuit": result.circuit, "proof": result.proof.hex(),
+                                      "public_inputs": result.public_inputs}) + "\n")
+        if out is not sys.stdout:
+            out.close()
+        return
+
+    parser = build_parser()
+    parser.add_argument("--include_grade", action="store_true", help="Disclose the grade.")
+    parser.add_argument("--include_major", action="store_true", help="Disclose the major.")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the proof cache")
+    args = vars(parser.parse_args())
+    circuit = circuit_for(args.pop("include_grade"), args.pop("include_major"))
+    use_cache = not args.pop("no_cache")
+    proof = prove(circuit, args, use_cache=use_cache).proof
+    print("∑", proof.hex())
+
+
+if __name__ == "__main__":
+    main()
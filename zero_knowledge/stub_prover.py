@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Local stand-in for ``nargo execute`` and ``bb prove``.
+
+Lets prover.py run without the Noir toolchain, e.g.
+``NARGO_BINARY="python3 stub_prover.py nargo"`` and
+``BB_BINARY="python3 stub_prover.py bb"``. The "witness" is the gzipped JSON
+of Prover.toml and the "proof" has bb's layout: a 4-byte field count, the
+public inputs in declaration order, then 440 fields derived from the inputs,
+so equal inputs give equal proofs. Nothing is actually proven.
+
+Both tools answer ``--version`` with a fixed stub version, so proof_cache.py
+caches stub proofs under a toolchain of their own.
+
+Environment:
+    STUB_PROVER_DELAY   seconds to sleep per bb call (default 0)
+"""
+import gzip
+import hashlib
+import json
+import os
+import sys
+import time
+
+PROOF_FIELDS = 440
+VERSION = "stub_prover 1.0 (no real proofs)"
+
+
+def read_toml(path):
+    """Parse the flat ``key = "value"`` / ``key = ["a", "b"]`` files written by prover.py."""
+    inputs = {}
+    with open(path) as f:
+        for line in f:
+            key, sep, value = line.partition("=")
+            if not sep:
+                continue
+            value = value.strip()
+            if value.startswith("["):
+                inputs[key.strip()] = [v.strip().strip('"') for v in value[1:-1].split(",") if v.strip()]
+            else:
+                inputs[key.strip()] = value.strip('"')
+    return inputs
+
+
+def field(value) -> bytes:
+    value = str(value)
+    number = int(value, 16) if value[:2] in ("0x", "0X") else int(value)
+    return number.to_bytes(32, "big")
+
+
+def nargo(args):
+    if args[:1] != ["execute"]:
+        print(f"stub nargo: unsupported command {args[:1]}", file=sys.stderr)
+        return 1
+    inputs = read_toml("Prover.toml")
+    name = None
+    with open("Nargo.toml") as f:
+        for line in f:
+            key, _, value = line.partition("=")
+            if key.strip() == "name":
+                name = value.strip().strip('"')
+    os.makedirs("target", exist_ok=True)
+    with gzip.open(os.path.join("target", f"{name}.gz"), "wt") as f:
+        json.dump(inputs, f)
+    print(f"[{name}] Circuit witness successfully solved")
+    return 0
+
+
+def bb(args):
+    if args[:1] != ["prove"]:
+        print(f"stub bb: unsupported command {args[:1]}", file=sys.stderr)
+        return 1
+    program = args[args.index("-b") + 1]
+    witness = args[args.index("-w") + 1]
+    out_dir = args[args.index("-o") + 1]
+    with open(program) as f:
+        names = [p["name"] for p in json.load(f)["abi"]["parameters"] if p["visibility"] == "public"]
+    with gzip.open(witness, "rt") as f:
+        inputs = json.load(f)
+
+    time.sleep(float(os.environ.get("STUB_PROVER_DELAY", "0")))
+
+    seed = hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).digest()
+    body = b"".join(hashlib.sha256(seed + i.to_bytes(4, "big")).digest() for i in range(PROOF_FIELDS))
+    proof = (len(names) + PROOF_FIELDS).to_bytes(4, "big") + b"".join(field(inputs[n]) for n in names) + body
+    with open(os.path.join(out_dir, "proof"), "wb") as f:
+        f.write(proof)
+    print("Proof saved to", os.path.join(out_dir, "proof"))
+    return 0
+
+
+if __name__ == "__main__":
+    tool, args = sys.argv[1], sys.argv[2:]
+    if args == ["--version"]:
+        print(f"{tool} {VERSION}")
+        sys.exit(0)
+    sys.exit({"nargo": nargo, "bb": bb}[tool](args))
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The zero_knowledge modules are imported as top-level scripts.
+basedir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, basedir)
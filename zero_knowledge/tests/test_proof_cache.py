@@ -0,0 +1,43 @@
+"""prover.prove reuses, and re-proves corrupt, proof cache entries under stub_prover.py."""
+import os
+import sys
+
+import proof_cache
+import prover
+import stub_prover
+
+STUB = f"{sys.executable} {os.path.join(prover.basedir, 'stub_prover.py')}"
+CIRCUIT = "verifyNoGradeNoMajor"
+
+
+def test_hit_miss_and_corruption(tmp_path, monkeypatch):
+    cache = proof_cache.ProofCache(str(tmp_path))
+    monkeypatch.setattr(proof_cache, "_cache", cache)
+    inputs = stub_prover.read_toml(os.path.join(prover.CIRCUITS_DIR, CIRCUIT, "Prover.toml"))
+    nargo, bb = f"{STUB} nargo", f"{STUB} bb"
+    assert proof_cache.toolchain_id(nargo, bb) is not None
+
+    first = prover.prove(CIRCUIT, inputs, nargo=nargo, bb=bb)
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    second = prover.prove(CIRCUIT, inputs, nargo=nargo, bb=bb)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert second == first
+
+    # A corrupt entry is discarded, re-proven and stored again.
+    key = proof_cache.proof_key(os.path.join(prover.CIRCUITS_DIR, CIRCUIT, "target", "program.json"),
+                                inputs, proof_cache.toolchain_id(nargo, bb))
+    path = cache._path(key)
+    with open(path, "r+b") as f:
+        f.seek(-1, os.SEEK_END)
+        last = f.read(1)
+        f.seek(-1, os.SEEK_END)
+        f.write(bytes([last[0] ^ 0xFF]))
+    third = prover.prove(CIRCUIT, inputs, nargo=nargo, bb=bb)
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert third == first
+    assert cache.get(key) == first.proof
+
+    # Other inputs miss.
+    prover.prove(CIRCUIT, dict(inputs, course_idx="5"), nargo=nargo, bb=bb)
+    assert cache.misses == 3
@@ -0,0 +1,453 @@
+"""Python builder for the depth-18 school Merkle tree.
+
+Produces the same tree as ``build_full_merkle_tree.ts``. Leaf indices pack
+college/department/course/student (``c * 32768 + d * 4096 + k * 512 + s``), so
+each college owns an independent 2^15 subtree: those are built on a process
+pool, one Pedersen hasher per worker, and their roots are combined into
+levels 15-18. Every layer is hashed as one batch over the nodes that have a
+non-empty subtree; everything else is a precomputed zero hash.
+
+    python3 merkle_tree.py --workers 8 --output full_tree.json
+
+The hasher is pluggable: anything with ``hash_pairs([(left, right), ...])``
+returning ``pedersen([left, right])`` for each pair. The default runs
+``pedersen_hasher.js`` on Node with the ``@aztec/bb.js`` from ``node_modules``.
+"""
+import argparse
+import csv
+import json
+import os
+import shlex
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+
+from tree_file import TreeFile, write_tree
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+
+CSV_FILE = os.path.join(basedir, "courses_assigned.csv")
+FULL_TREE_FILE = os.path.join(basedir, "full_tree.json")
+NODE_BINARY = os.environ.get("NODE_BINARY", "node")
+TREE_WORKERS = int(os.environ.get("TREE_WORKERS", str(os.cpu_count() or 1)))
+
+TREE_LEVELS = 18
+COLLEGE_LEVELS = 15  # levels inside one college subtree
+ZERO_VALUE = 0x18d85f3de6dcd78b6ffbf5d8374433a5528d8e3bf2100df0b7bb43a4c59ebd63
+EXPECTED_ROOT = 0x04c904ec344f5d4b7c6dd0f82605c7aa698f8775feb2238ac48903378159c5a3
+
+PROFESSORS = [
+    "Dr. Alice Smith", "Dr. Bob Johnson", "Dr. Carol Williams", "Dr. David Brown",
+    "Dr. Emma Davis", "Dr. Frank Miller", "Dr. Grace Wilson", "Dr. Henry Moore",
+]
+GRADES = ["F", "D", "C-", "C", "C+", "B-", "B", "B+", "A-", "A"]
+PROFESSOR_CODES = {name: idx for idx, name in enumerate(PROFESSORS)}
+GRADE_CODES = {grade: idx for idx, grade in enumerate(GRADES)}
+COURSE_FIXED = {"101": 0, "102": 1, "201": 2, "202": 3, "301": 4, "302": 5, "595": 6}
+
+COLLEGE_MULT = 1 << 15
+DEPT_MULT = 1 << 12
+COURSE_MULT = 1 << 9
+
+FIELD_SIZE = 32
+HASH_BATCH = 1 << 16
+
+
+class NodeBbHasher:
+    """Pedersen hasher backed by a long-running ``pedersen_hasher.js`` process."""
+
+    def __init__(self, node: str = NODE_BINARY):
+        self._proc = subprocess.Popen(
+            shlex.split(node) + [os.path.join(basedir, "pedersen_hasher.js")],
+            cwd=basedir, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+        )
+        self.calls = 0
+
+    def hash_pairs(self, pairs) -> list:
+        out = []
+        for start in range(0, len(pairs), HASH_BATCH):
+            batch = pairs[start:start + HASH_BATCH]
+            request = bytearray(len(batch).to_bytes(4, "big"))
+            for left, right in batch:
+                request += left.to_bytes(FIELD_SIZE, "big") + right.to_bytes(FIELD_SIZE, "big")
+            self._proc.stdin.write(request)
+            self._proc.stdin.flush()
+            data = self._read(len(batch) * FIELD_SIZE)
+            out.extend(int.from_bytes(data[i:i + FIELD_SIZE], "big")
+                       for i in range(0, len(data), FIELD_SIZE))
+        self.calls += len(pairs)
+        return out
+
+    def _read(self, size: int) -> bytes:
+        data = bytearray()
+        while len(data) < size:
+            chunk = self._proc.stdout.read(size - len(data))
+            if not chunk:
+                raise RuntimeError("pedersen_hasher.js exited unexpectedly")
+            data += chunk
+        return bytes(data)
+
+    def close(self) -> None:
+        if self._proc.poll() is None:
+            self._proc.stdin.close()
+            self._proc.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def zero_hashes(hasher, levels: int = TREE_LEVELS) -> list:
+    """``zeros[i]``: root of an empty subtree of height *i*."""
+    zeros = [ZERO_VALUE]
+    for _ in range(levels):
+        zeros.append(hasher.hash_pairs([(zeros[-1], zeros[-1])])[0])
+    return zeros
+
+
+def load_rows(path: str = CSV_FILE) -> list:
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def index_rows(rows):
+    """Yield ``(leaf_index, row, major_idx)`` for each CSV row.
+
+    Indices follow build_full_merkle_tree.ts: colleges, departments and majors
+    (per college) are numbered in order of first appearance, and students in
+    order of first appearance within their course.
+    """
+    colleges, depts, majors, students = {}, {}, {}, {}
+    dept_counts, major_counts, student_counts = {}, {}, {}
+    for r in rows:
+        college = r["college"]
+        c = colleges.setdefault(college, len(colleges))
+
+        dept_key = (college, r["department"])
+        if dept_key not in depts:
+            depts[dept_key] = dept_counts.get(college, 0)
+            dept_counts[college] = depts[dept_key] + 1
+        d = depts[dept_key]
+
+        major_key = (college, r["major"])
+        if major_key not in majors:
+            majors[major_key] = major_counts.get(college, 0)
+            major_counts[college] = majors[major_key] + 1
+        m = majors[major_key]
+
+        k = COURSE_FIXED.get(r["course_number"])
+        if k is None:
+            raise ValueError(f"Unknown course number: {r['course_number']}")
+
+        course_key = dept_key + (r["course_number"],)
+        student_key = course_key + (r["pk_x_hi"], r["pk_x_lo"], r["pk_y_hi"], r["pk_y_lo"],
+                                    r["professor"], r["grade"], r["major"])
+        if student_key not in students:
+            students[student_key] = student_counts.get(course_key, 0)
+            student_counts[course_key] = students[student_key] + 1
+        s = students[student_key]
+
+        if c >= 1 << (TREE_LEVELS - COLLEGE_LEVELS):
+            raise ValueError(f"{len(colleges)} colleges do not fit in a depth-{TREE_LEVELS} tree")
+        if d >= COLLEGE_MULT // DEPT_MULT or s >= COURSE_MULT:
+            raise ValueError(f"Leaf index overflow for {college} / {r['department']} / {r['course_number']}")
+        yield c * COLLEGE_MULT + d * DEPT_MULT + k * COURSE_MULT + s, r, m
+
+
+def assign_leaves(rows) -> dict:
+    """Map each row to ``leaf_index -> (x_lo, x_hi, y_lo, y_hi, professor, grade, major)``."""
+    return {
+        idx: (int(r["pk_x_lo"], 16), int(r["pk_x_hi"], 16),
+              int(r["pk_y_lo"], 16), int(r["pk_y_hi"], 16),
+              PROFESSOR_CODES[r["professor"]], GRADE_CODES[r["grade"]], m)
+        for idx, r, m in index_rows(rows)
+    }
+
+
+def _hash_unique(hasher, pairs) -> list:
+    """Hash *pairs*, computing each distinct pair once."""
+    unique = list(dict.fromkeys(pairs))
+    table = dict(zip(unique, hasher.hash_pairs(unique)))
+    return [table[pair] for pair in pairs]
+
+
+def hash_leaves(hasher, inputs) -> list:
+    """Leaf hashes ``H(H(H(hx, hy), H(professor, grade)), major)`` for a list of inputs.
+
+    Every stage only hashes distinct pairs: ``hx``/``hy``/``h1`` once per
+    student key, ``h2`` once per (professor, grade) (at most 8 x 10), and the
+    major is mixed in last, so a student's enrollments share all but the
+    final one or two hashes.
+    """
+    n = len(inputs)
+    first = _hash_unique(hasher, [(x_lo, x_hi) for x_lo, x_hi, *_ in inputs]
+                         + [(y_lo, y_hi) for _, _, y_lo, y_hi, *_ in inputs]
+                         + [(p, g) for *_, p, g, _ in inputs])
+    hx, hy, h2 = first[:n], first[n:2 * n], first[2 * n:]
+    h1 = _hash_unique(hasher, list(zip(hx, hy)))
+    inner = _hash_unique(hasher, list(zip(h1, h2)))
+    return _hash_unique(hasher, [(h, m) for h, (*_, m) in zip(inner, inputs)])
+
+
+def build_layers(hasher, leaves: dict, height: int, zeros: list) -> list:
+    """Sparse layers ``[{index: node}, ...]`` of a subtree of *height* over *leaves*.
+
+    ``layers[0]`` is *leaves*; ``layers[height]`` holds the single root. Nodes
+    whose subtree is empty are not stored.
+    """
+    layers = [leaves]
+    for lvl in range(height):
+        below, zero = layers[-1], zeros[lvl]
+        parents = sorted({i >> 1 for i in below})
+        hashes = hasher.hash_pairs([(below.get(2 * p, zero), below.get(2 * p + 1, zero))
+                                    for p in parents])
+        layers.append(dict(zip(parents, hashes)))
+    return layers
+
+
+def _hash_college(hasher_factory, local_inputs: dict) -> dict:
+    hasher = hasher_factory()
+    try:
+        indices = sorted(local_inputs)
+        return dict(zip(indices, hash_leaves(hasher, [local_inputs[i] for i in indices])))
+    finally:
+        hasher.close()
+
+
+def _build_college(hasher_factory, local: dict, hashed: bool) -> list:
+    hasher = hasher_factory()
+    try:
+        zeros = zero_hashes(hasher, COLLEGE_LEVELS)
+        if not hashed:
+            indices = sorted(local)
+            local = dict(zip(indices, hash_leaves(hasher, [local[i] for i in indices])))
+        return build_layers(hasher, local, COLLEGE_LEVELS, zeros)
+    finally:
+        hasher.close()
+
+
+def _map_colleges(fn, hasher_factory, values: dict, workers: int, *args):
+    """Run ``fn(hasher_factory, college_values, *args)`` per college, on a pool if *workers* > 1.
+
+    *values* is re-indexed within each college; returns ``(colleges, results)``.
+    """
+    by_college = {}
+    for idx, value in values.items():
+        by_college.setdefault(idx // COLLEGE_MULT, {})[idx % COLLEGE_MULT] = value
+    colleges = sorted(by_college)
+    jobs = [(hasher_factory, by_college[c]) + args for c in colleges]
+    if workers > 1 and len(colleges) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(colleges))) as pool:
+            return colleges, list(pool.map(fn, *zip(*jobs)))
+    return colleges, [fn(*job) for job in jobs]
+
+
+def hash_leaf_values(leaf_inputs: dict, workers: int = TREE_WORKERS,
+                     hasher_factory=NodeBbHasher) -> dict:
+    """Leaf hash of every ``assign_leaves`` entry, one college per worker."""
+    colleges, results = _map_colleges(_hash_college, hasher_factory, leaf_inputs, workers)
+    return {c * COLLEGE_MULT + i: v for c, leaves in zip(colleges, results) for i, v in leaves.items()}
+
+
+def write_leaves(path: str, leaves: dict) -> None:
+    """Write leaf hashes as level 0 of a depth-0 ``tree_file``."""
+    write_tree(path, [leaves], [ZERO_VALUE])
+
+
+def read_leaves(path: str) -> dict:
+    """Leaf hashes from level 0 of any ``tree_file``."""
+    with TreeFile(path) as f:
+        if f.zeros[0] != ZERO_VALUE:
+            raise ValueError(f"{path} uses a different zero value")
+        return f.level(0)
+
+
+class MerkleTree:
+    """Sparse depth-18 tree; ``layers[lvl]`` maps node index to value."""
+
+    def __init__(self, layers: list, zeros: list, leaf_inputs: dict = None):
+        self.layers = layers
+        self.zeros = zeros
+        self.levels = len(layers) - 1
+        # assign_leaves output the leaves were hashed from, if known.
+        self.leaf_inputs = leaf_inputs
+
+    def node(self, lvl: int, index: int) -> int:
+        return self.layers[lvl].get(index, self.zeros[lvl])
+
+    def root(self) -> int:
+        return self.node(self.levels, 0)
+
+    def proof(self, index: int):
+        """Sibling path and direction bits from leaf *index* up to the root."""
+        path, indices = [], []
+        for lvl in range(self.levels):
+            path.append(self.node(lvl, index ^ 1))
+            indices.append(index & 1)
+            index >>= 1
+        return path, indices
+
+    def to_json(self, path: str = FULL_TREE_FILE) -> None:
+        """Write the tree in the ``full_tree.json`` layout the TS tools read."""
+        storage = [[f"{lvl}-{i}", f"0x{v:064x}"]
+                   for lvl, layer in enumerate(self.layers) for i, v in sorted(layer.items())]
+        data = {"levels": self.levels, "zeroValue": f"0x{self.zeros[0]:064x}", "storage": storage}
+        if self.leaf_inputs is not None:
+            # Extra key, ignored by the TS tools; lets update() skip rehashing unchanged leaves.
+            data["leafInputs"] = [[i, [hex(v) for v in inputs]]
+                                  for i, inputs in sorted(self.leaf_inputs.items())]
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+
+    @classmethod
+    def from_json(cls, path: str = FULL_TREE_FILE, hasher=None):
+        with open(path) as f:
+            data = json.load(f)
+        layers = [{} for _ in range(data["levels"] + 1)]
+        for key, value in data["storage"]:
+            lvl, _, i = key.partition("-")
+            layers[int(lvl)][int(i)] = int(value, 16)
+        if hasher is None:
+            with NodeBbHasher() as hasher:
+                zeros = zero_hashes(hasher, data["levels"])
+        else:
+            zeros = zero_hashes(hasher, data["levels"])
+        if zeros[0] != int(data["zeroValue"], 16):
+            raise ValueError(f"{path} uses a different zero value")
+        leaf_inputs = None
+        if "leafInputs" in data:
+            leaf_inputs = {i: tuple(int(v, 16) for v in inputs) for i, inputs in data["leafInputs"]}
+        # Drop stored empty-subtree nodes (the TS builder writes them out).
+        return cls([{i: v for i, v in layer.items() if v != zeros[lvl]}
+                    for lvl, layer in enumerate(layers)], zeros, leaf_inputs)
+
+    def to_binary(self, path: str) -> None:
+        """Write the tree in the mmap-able ``tree_file`` format."""
+        write_tree(path, self.layers, self.zeros)
+
+    @classmethod
+    def from_binary(cls, path: str):
+        with TreeFile(path) as f:
+            return cls(f.layers(), f.zeros)
+
+    def save(self, path: str) -> None:
+        """Write binary for a ``.bin`` path, full_tree.json otherwise."""
+        if path.endswith(".bin"):
+            self.to_binary(path)
+        else:
+            self.to_json(path)
+
+    @classmethod
+    def load(cls, path: str, hasher=None):
+        if path.endswith(".bin"):
+            return cls.from_binary(path)
+        return cls.from_json(path, hasher)
+
+    def update(self, hasher, leaf_inputs: dict) -> list:
+        """Move the tree to a new ``assign_leaves`` result; return the changed leaf indices.
+
+        Only changed leaves and their ancestors are rehashed, one batch per
+        level, so ancestors shared by several changes are hashed once. Without
+        stored leaf inputs (a tree from the TS builder or a binary file) every
+        leaf is rehashed and compared with the stored level 0 instead.
+        """
+        leaves = self.layers[0]
+        if self.leaf_inputs is not None:
+            candidates = sorted(i for i in self.leaf_inputs.keys() | leaf_inputs.keys()
+                                if self.leaf_inputs.get(i) != leaf_inputs.get(i))
+        else:
+            candidates = sorted(leaves.keys() | leaf_inputs.keys())
+        present = [i for i in candidates if i in leaf_inputs]
+        values = dict(zip(present, hash_leaves(hasher, [leaf_inputs[i] for i in present])))
+
+        changed = [i for i in candidates if values.get(i, self.zeros[0]) != self.node(0, i)]
+        for i in changed:
+            self._set(0, i, values.get(i, self.zeros[0]))
+        dirty = changed
+        for lvl in range(self.levels):
+            dirty = sorted({i >> 1 for i in dirty})
+            hashes = hasher.hash_pairs([(self.node(lvl, 2 * p), self.node(lvl, 2 * p + 1))
+                                        for p in dirty])
+            for p, h in zip(dirty, hashes):
+                self._set(lvl + 1, p, h)
+        self.leaf_inputs = dict(leaf_inputs)
+        return changed
+
+    def _set(self, lvl: int, index: int, value: int) -> None:
+        if value == self.zeros[lvl]:
+            self.layers[lvl].pop(index, None)
+        else:
+            self.layers[lvl][index] = value
+
+
+def build_tree(leaves: dict, workers: int = TREE_WORKERS,
+               hasher_factory=NodeBbHasher, hashed: bool = False) -> MerkleTree:
+    """Build the full tree, one college per worker.
+
+    *leaves* is ``assign_leaves`` output, or leaf hashes if *hashed*.
+    """
+    colleges, subtrees = _map_colleges(_build_college, hasher_factory, leaves, workers, hashed)
+
+    layers = [{} for _ in range(COLLEGE_LEVELS + 1)]
+    for c, subtree in zip(colleges, subtrees):
+        for lvl, layer in enumerate(subtree):
+            offset = c << (COLLEGE_LEVELS - lvl)
+            layers[lvl].update((offset + i, v) for i, v in layer.items())
+
+    hasher = hasher_factory()
+    try:
+        zeros = zero_hashes(hasher, TREE_LEVELS)
+        top = build_layers(hasher, layers[COLLEGE_LEVELS], TREE_LEVELS - COLLEGE_LEVELS,
+                           zeros[COLLEGE_LEVELS:])
+    finally:
+        hasher.close()
+    return MerkleTree(layers + top[1:], zeros, None if hashed else dict(leaves))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the school Merkle tree from courses_assigned.csv.")
+    parser.add_argument("--csv", default=CSV_FILE)
+    parser.add_argument("--workers", type=int, default=TREE_WORKERS)
+    parser.add_argument("--output", help="Write the tree to this path (binary if it ends in .bin)")
+    parser.add_argument("--update", metavar="TREE",
+                        help="Update this tree file in place (or into --output) instead of rebuilding")
+    parser.add_argument("--leaves-output", metavar="PATH",
+                        help="Only hash the leaves, writing them as a binary leaf array")
+    parser.add_argument("--leaves", metavar="PATH",
+                        help="Build from a binary leaf array (or tree file) instead of the CSV")
+    parser.add_argument("--expect-root", help="Fail unless the root equals this value")
+    args = parser.parse_args()
+    if args.leaves and (args.update or args.leaves_output):
+        parser.error("--leaves cannot be combined with --update or --leaves-output")
+
+    if args.leaves:
+        leaves = read_leaves(args.leaves)
+    else:
+        leaves = assign_leaves(load_rows(args.csv))
+    if args.leaves_output:
+        write_leaves(args.leaves_output, hash_leaf_values(leaves, args.workers))
+        print("Hashed leaves:", len(leaves))
+        print(f"✔  {args.leaves_output} written")
+        return
+    if args.update:
+        with NodeBbHasher() as hasher:
+            tree = MerkleTree.load(args.update, hasher)
+            changed = tree.update(hasher, leaves)
+            print("Changed leaves:", " ".join(map(str, changed)) or "none")
+            print("Pedersen hashes:", hasher.calls)
+        args.output = args.output or args.update
+    else:
+        tree = build_tree(leaves, args.workers, hashed=bool(args.leaves))
+        print("Inserted leaves:", len(leaves))
+    root = tree.root()
+    print("Merkle root:", f"0x{root:064x}")
+    if args.output:
+        tree.save(args.output)
+        print(f"✔  {args.output} written")
+    if args.expect_root and int(args.expect_root, 16) != root:
+        raise SystemExit(f"Root mismatch: expected {args.expect_root}")
+
+
+if __name__ == "__main__":
+    main()
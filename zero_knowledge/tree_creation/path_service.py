@@ -0,0 +1,200 @@
+"""Leaf lookup and Merkle path service for proof preparation.
+
+Indexes ``courses_assigned.csv`` once, by (college, department, course, pk)
+and by pk alone, and answers batches of lookups with each leaf's index,
+sibling path and the remaining circuit inputs, in the shape ``prover.py``
+takes for a job's ``inputs``. Paths are read from a tree file (``.bin``
+through mmap, or ``full_tree.json``).
+
+    python3 path_service.py --tree full_tree.bin lookup --queries queries.json
+    python3 path_service.py --tree full_tree.bin serve --bind 127.0.0.1:5002
+
+A query is ``{"college", "department", "course_number", "pk_x", "pk_y"}`` for
+one enrollment, or just ``{"pk_x", "pk_y"}`` for all of a student's leaves;
+coordinates are hex strings or integers.
+"""
+import argparse
+import json
+import os
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from merkle_tree import CSV_FILE, GRADE_CODES, PROFESSOR_CODES, MerkleTree, index_rows, load_rows
+from tree_file import TreeFile
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+
+TREE_FILE = os.environ.get("TREE_FILE", os.path.join(basedir, "full_tree.bin"))
+PATH_SERVICE_BIND = os.environ.get("PATH_SERVICE_BIND", "127.0.0.1:5002")
+# Upper bound on queries per request.
+MAX_QUERIES = int(os.environ.get("PATH_SERVICE_MAX_QUERIES", "10000"))
+
+
+def open_tree(path: str):
+    """A tree exposing ``root()`` and ``proof(index)``: mmap for ``.bin``, else JSON."""
+    if path.endswith(".bin"):
+        return TreeFile(path)
+    return MerkleTree.from_json(path)
+
+
+def parse_coordinate(value) -> int:
+    if isinstance(value, bool):
+        raise ValueError("Invalid public key coordinate")
+    if isinstance(value, int):
+        return value
+    try:
+        return int(str(value).strip(), 16)
+    except ValueError:
+        raise ValueError("Invalid public key coordinate") from None
+
+
+class LeafIndex:
+    """Maps enrollments and public keys to leaves of *tree*."""
+
+    def __init__(self, rows, tree):
+        self.tree = tree
+        self._by_enrollment = {}
+        self._by_pk = {}
+        self._inputs = {}
+        for idx, r, major in index_rows(rows):
+            if idx in self._inputs:
+                continue
+            x = int(r["pk_x_hi"], 16) << 128 | int(r["pk_x_lo"], 16)
+            y = int(r["pk_y_hi"], 16) << 128 | int(r["pk_y_lo"], 16)
+            self._by_enrollment.setdefault((r["college"], r["department"], r["course_number"], x, y), idx)
+            self._by_pk.setdefault((x, y), []).append(idx)
+            self._inputs[idx] = {
+                "pk_x_hi": r["pk_x_hi"],
+                "pk_x_lo": r["pk_x_lo"],
+                "pk_y_hi": r["pk_y_hi"],
+                "pk_y_lo": r["pk_y_lo"],
+                "professor": PROFESSOR_CODES[r["professor"]],
+                "grade": GRADE_CODES[r["grade"]],
+                "major": major,
+                "college_idx": idx >> 15,
+                "dept_idx": (idx >> 12) & 7,
+                "course_idx": (idx >> 9) & 7,
+            }
+        for leaves in self._by_pk.values():
+            leaves.sort()
+
+    @classmethod
+    def from_files(cls, csv_path: str = CSV_FILE, tree_path: str = TREE_FILE):
+        return cls(load_rows(csv_path), open_tree(tree_path))
+
+    def leaf(self, college: str, department: str, course_number, pk_x, pk_y):
+        """Leaf index of one enrollment, or None."""
+        key = (college, department, str(course_number),
+               parse_coordinate(pk_x), parse_coordinate(pk_y))
+        return self._by_enrollment.get(key)
+
+    def leaves(self, pk_x, pk_y) -> list:
+        """Leaf indices of every enrollment of a student."""
+        return list(self._by_pk.get((parse_coordinate(pk_x), parse_coordinate(pk_y)), []))
+
+    def prover_inputs(self, idx: int) -> dict:
+        """Circuit inputs for leaf *idx*, including its path and the current root."""
+        path, _ = self.tree.proof(idx)
+        return dict(self._inputs[idx], leaf_index=idx, path=[f"0x{p:064x}" for p in path],
+                    rootSchool=f"0x{self.tree.root():064x}")
+
+    def lookup(self, query: dict) -> dict:
+        """Answer one query with ``{"leaves": [...]}`` or ``{"error": ...}``."""
+        try:
+            if "college" in query:
+                idx = self.leaf(query["college"], query["department"], query["course_number"],
+                                query["pk_x"], query["pk_y"])
+                indices = [] if idx is None else [idx]
+            else:
+                indices = self.leaves(query["pk_x"], query["pk_y"])
+        except KeyError as e:
+            return {"error": f"Missing field: {e.args[0]}"}
+        except ValueError as e:
+            return {"error": str(e)}
+        if not indices:
+            return {"error": "Not enrolled"}
+        return {"leaves": [self.prover_inputs(i) for i in indices]}
+
+    def lookup_many(self, queries) -> list:
+        return [self.lookup(q) for q in queries]
+
+
+def make_handler(index: LeafIndex):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, body: dict) -> None:
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/root":
+                self._send(200, {"root": f"0x{index.tree.root():064x}"})
+            else:
+                self._send(404, {"error": "Not found"})
+
+        def do_POST(self):
+            if self.path != "/lookup":
+                self._send(404, {"error": "Not found"})
+                return
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                queries = body["queries"]
+            except (ValueError, KeyError, TypeError):
+                self._send(400, {"error": "Expected a JSON body with a queries list"})
+                return
+            if not isinstance(queries, list) or not all(isinstance(q, dict) for q in queries):
+                self._send(400, {"error": "Expected a JSON body with a queries list"})
+                return
+            if len(queries) > MAX_QUERIES:
+                self._send(413, {"error": f"At most {MAX_QUERIES} queries per request"})
+                return
+            self._send(200, {"results": index.lookup_many(queries)})
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Leaf lookup and Merkle path service.")
+    parser.add_argument("--csv", default=CSV_FILE)
+    parser.add_argument("--tree", default=TREE_FILE, help="Tree file (.bin or full_tree.json)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    p = commands.add_parser("lookup", help="Answer a JSON list of queries")
+    p.add_argument("--queries", required=True, help="JSON file with a list of queries")
+    p.add_argument("--output", default="-", help="Output file (default: stdout)")
+    p.add_argument("--jobs", action="store_true",
+                   help="Write a prover.py jobs list instead of lookup results")
+    p.add_argument("--include_grade", action="store_true", help="Jobs disclose the grade.")
+    p.add_argument("--include_major", action="store_true", help="Jobs disclose the major.")
+    p = commands.add_parser("serve", help="Serve POST /lookup and GET /root over HTTP")
+    p.add_argument("--bind", default=PATH_SERVICE_BIND)
+    args = parser.parse_args()
+
+    index = LeafIndex.from_files(args.csv, args.tree)
+    if args.command == "serve":
+        host, _, port = args.bind.rpartition(":")
+        server = ThreadingHTTPServer((host or "127.0.0.1", int(port)), make_handler(index))
+        print(f"Serving leaf lookups on {args.bind}")
+        server.serve_forever()
+        return
+
+    with open(args.queries) as f:
+        results = index.lookup_many(json.load(f))
+    if args.jobs:
+        for i, result in enumerate(results):
+            if "error" in result:
+                print(f"Query {i}: {result['error']}", file=sys.stderr)
+        results = [{"include_grade": args.include_grade, "include_major": args.include_major,
+                    "inputs": leaf}
+                   for result in results for leaf in result.get("leaves", [])]
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    json.dump(results, out, indent=2)
+    out.write("\n")
+    if out is not sys.stdout:
+        out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+// pedersen_hasher.js
+// Batch Pedersen hashing for merkle_tree.py over stdin/stdout.
+//
+// Request:  4-byte big-endian pair count N, then N pairs of 32-byte
+//           big-endian field elements (left, right).
+// Response: N 32-byte hashes, pedersenHash([left, right], 0), in order.
+//
+//   node pedersen_hasher.js
+
+const { BarretenbergSync, Fr } = require("@aztec/bb.js");
+
+const FIELD_SIZE = 32;
+
+(async () => {
+  await BarretenbergSync.initSingleton();
+  const bb = BarretenbergSync.getSingleton();
+
+  let pending = Buffer.alloc(0);
+  process.stdin.on("data", (chunk) => {
+    pending = Buffer.concat([pending, chunk]);
+    while (pending.length >= 4) {
+      const count = pending.readUInt32BE(0);
+      const size = 4 + count * 2 * FIELD_SIZE;
+      if (pending.length < size) break;
+
+      const out = Buffer.alloc(count * FIELD_SIZE);
+      for (let i = 0; i < count; i++) {
+        const off = 4 + i * 2 * FIELD_SIZE;
+        const left = Fr.fromBuffer(pending.subarray(off, off + FIELD_SIZE));
+        const right = Fr.fromBuffer(pending.subarray(off + FIELD_SIZE, off + 2 * FIELD_SIZE));
+        out.set(bb.pedersenHash([left, right], 0).toBuffer(), i * FIELD_SIZE);
+      }
+      process.stdout.write(out);
+      pending = pending.subarray(size);
+    }
+  });
+})();
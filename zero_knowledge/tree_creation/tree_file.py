@@ -0,0 +1,157 @@
+"""Compact binary Merkle tree file, read through mmap.
+
+Layout (integers big-endian):
+
+    magic "CCMT" | u32 version | u32 depth
+    (depth + 1) x 32-byte zero value, zeros[0] being the empty leaf
+    (depth + 1) x u64 node count
+    level 0 nodes | level 1 nodes | ... | level depth nodes
+
+Each level is a contiguous array of 32-byte field elements covering indices
+``0 .. count - 1``; nodes past the end are the level's zero value. Reading a
+node is one offset computation, so a sibling path touches 18 slices of the
+mapping and never loads the rest of the file.
+
+    python3 tree_file.py convert full_tree.json full_tree.bin
+    python3 tree_file.py path full_tree.bin 2048
+"""
+import argparse
+import mmap
+import os
+import struct
+import tempfile
+
+MAGIC = b"CCMT"
+VERSION = 1
+FIELD_SIZE = 32
+HEADER = struct.Struct(">4sII")
+COUNT = struct.Struct(">Q")
+
+
+def write_tree(path: str, layers: list, zeros: list) -> None:
+    """Write sparse ``layers[lvl] = {index: node}`` with their zero values to *path*."""
+    depth = len(layers) - 1
+    counts = [max(layer) + 1 if layer else 0 for layer in layers]
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=".tmp-")
+    with os.fdopen(fd, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, depth))
+        f.write(b"".join(z.to_bytes(FIELD_SIZE, "big") for z in zeros[:depth + 1]))
+        f.write(b"".join(COUNT.pack(n) for n in counts))
+        for layer, zero, count in zip(layers, zeros, counts):
+            level = bytearray(zero.to_bytes(FIELD_SIZE, "big") * count)
+            for i, value in layer.items():
+                level[FIELD_SIZE * i:FIELD_SIZE * (i + 1)] = value.to_bytes(FIELD_SIZE, "big")
+            f.write(level)
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, path)
+
+
+class TreeFile:
+    """Read-only view of a binary tree file."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, depth = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"{path} is not a version {VERSION} tree file")
+        self.depth = depth
+        pos = HEADER.size
+        self.zeros = [int.from_bytes(self._mm[pos + FIELD_SIZE * i:pos + FIELD_SIZE * (i + 1)], "big")
+                      for i in range(depth + 1)]
+        pos += FIELD_SIZE * (depth + 1)
+        self.counts = [COUNT.unpack_from(self._mm, pos + COUNT.size * i)[0] for i in range(depth + 1)]
+        pos += COUNT.size * (depth + 1)
+        self._offsets = []
+        for count in self.counts:
+            self._offsets.append(pos)
+            pos += FIELD_SIZE * count
+        if pos != len(self._mm):
+            self._mm.close()
+            raise ValueError(f"{path} is truncated or has trailing data")
+
+    def node(self, lvl: int, index: int) -> int:
+        if index >= self.counts[lvl]:
+            return self.zeros[lvl]
+        start = self._offsets[lvl] + FIELD_SIZE * index
+        return int.from_bytes(self._mm[start:start + FIELD_SIZE], "big")
+
+    def root(self) -> int:
+        return self.node(self.depth, 0)
+
+    def leaf(self, index: int) -> int:
+        return self.node(0, index)
+
+    def proof(self, index: int):
+        """Sibling path and direction bits from leaf *index* up to the root."""
+        if not 0 <= index < 1 << self.depth:
+            raise ValueError(f"Leaf index {index} out of range")
+        path, indices = [], []
+        for lvl in range(self.depth):
+            path.append(self.node(lvl, index ^ 1))
+            indices.append(index & 1)
+            index >>= 1
+        return path, indices
+
+    def level(self, lvl: int) -> dict:
+        """Sparse ``{index: node}`` of one level, omitting zero-valued nodes."""
+        zero = self.zeros[lvl].to_bytes(FIELD_SIZE, "big")
+        base = self._offsets[lvl]
+        layer = {}
+        for i in range(self.counts[lvl]):
+            value = self._mm[base + FIELD_SIZE * i:base + FIELD_SIZE * (i + 1)]
+            if value != zero:
+                layer[i] = int.from_bytes(value, "big")
+        return layer
+
+    def layers(self) -> list:
+        return [self.level(lvl) for lvl in range(self.depth + 1)]
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def convert(json_path: str, bin_path: str) -> None:
+    """Convert a ``full_tree.json`` (from either builder) to the binary format."""
+    from merkle_tree import MerkleTree
+
+    tree = MerkleTree.from_json(json_path)
+    write_tree(bin_path, tree.layers, tree.zeros)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Binary Merkle tree files.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    p = commands.add_parser("convert", help="Convert full_tree.json to the binary format")
+    p.add_argument("json_path")
+    p.add_argument("bin_path")
+    p = commands.add_parser("path", help="Print the root and sibling path of a leaf")
+    p.add_argument("bin_path")
+    p.add_argument("leaf_index", type=int)
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        convert(args.json_path, args.bin_path)
+        with TreeFile(args.bin_path) as tree:
+            print("Merkle root:", f"0x{tree.root():064x}")
+        print(f"✔  {args.bin_path} written")
+    else:
+        with TreeFile(args.bin_path) as tree:
+            path, indices = tree.proof(args.leaf_index)
+            print(f'leaf_index   = "{args.leaf_index}"')
+            print(f'rootSchool   = "0x{tree.root():064x}"')
+            print("path         = [")
+            for i, (sibling, bit) in enumerate(zip(path, indices)):
+                print(f'  "0x{sibling:064x}", // idx {i}, dir={bit}')
+            print("]")
+
+
+if __name__ == "__main__":
+    main()